@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+"""Stress scenarios for the headless game loop.
+
+Each scenario fills a headless `Game` with many of one kind of thing (snow
+flakes, bubbles, bouncing projectiles or items) and steps it for a fixed
+number of ticks.  Reports ticks per second, the mean time of every stage
+and the peak memory, and compares them with a baseline saved by an earlier
+run.  Run from the repository root with `python -m bench.scenarios`.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import pygame as pg
+
+from christmas.component import LifetimeComp, ParticleSourceComp, \
+                                PositionBoundComp, PositionComp
+from christmas.game import FPS, Game
+from christmas.item import BeerItem, OrnamentItem
+from christmas.profiler import Profiler
+from christmas.projectile import CoalProjectile
+from christmas.rng import Rng
+
+
+WIDTH, HEIGHT = 700, 700
+DEFAULT_TICKS = 300
+DEFAULT_BASELINE = 'bench/baseline.json'
+# Slowdown (or memory growth) past which a result counts as a regression.
+DEFAULT_TOLERANCE = 0.1
+# Bubbles alive at once per source: each source of intensity 10 spawns a mean
+# of 0.45 bubbles per tick, and bubbles live for 20 ticks.
+BUBBLES_PER_SOURCE = 9
+
+
+def setup_snow(game, n, rng):
+    game.globe.max_live = n
+    game.globe.burst(n)
+
+
+def tick_snow(game):
+    # Headless games don't update the snow themselves.
+    with game.profiler.time('snow'):
+        game.globe.update(1 / FPS)
+
+
+def setup_bubbles(game, n, rng):
+    for _ in range(max(1, n // BUBBLES_PER_SOURCE)):
+        source = game.create_entity()
+        source.add_comp(PositionComp(rng.integers(WIDTH), rng.integers(HEIGHT)))
+        source.add_comp(ParticleSourceComp('drunk', 10))
+
+
+def setup_projectiles(game, n, rng):
+    # Bounce them in a strip down the left side, out of the players' way,
+    # so that none of them hit anyone and die.
+    bound = pg.Rect(0, 0, WIDTH // 4, HEIGHT)
+    for _ in range(n):
+        projectile = game.create_entity()
+        CoalProjectile.init(projectile, game.bottom_player,
+                            rng.integers(bound.w - 32), rng.integers(HEIGHT - 32),
+                            rng.normal(0, 5), rng.normal(0, 5))
+        projectile.set_comp(PositionBoundComp(bound))
+        projectile.set_comp(LifetimeComp(sys.maxsize))
+
+
+def setup_items(game, n, rng):
+    for i in range(n):
+        item = game.create_entity()
+        item_type = OrnamentItem if i % 2 else BeerItem
+        item_type.init(item, (rng.integers(WIDTH), rng.integers(HEIGHT)))
+        item.set_comp(LifetimeComp(sys.maxsize))
+
+
+# Name -> (setup, per-tick hook, default count).
+SCENARIOS = {
+    'snow': (setup_snow, tick_snow, 10000),
+    'bubbles': (setup_bubbles, None, 1000),
+    'projectiles': (setup_projectiles, None, 1000),
+    'items': (setup_items, None, 1000),
+}
+
+
+def make_game(name, n, ticks, seed):
+    setup, _, _ = SCENARIOS[name]
+    # Without bots, nobody moves or fires, so only the scenario's load counts.
+    game = Game(WIDTH, HEIGHT, headless=True, bots=False, seed=seed)
+    game.profiler = Profiler(window=ticks)
+    game.init()
+    setup(game, n, Rng(seed))
+    return game
+
+
+def step(game, name, ticks):
+    _, tick, _ = SCENARIOS[name]
+    for _ in range(ticks):
+        game.step()
+        if tick is not None:
+            tick(game)
+        game.profiler.end_frame()
+
+
+def run_scenario(name, n, ticks, seed=0, memory=True):
+    """Runs scenario `name` with `n` things for `ticks` ticks.
+
+    Memory is measured on a second run, since tracing slows everything down.
+    """
+    game = make_game(name, n, ticks, seed)
+    start = time.perf_counter()
+    step(game, name, ticks)
+    elapsed = time.perf_counter() - start
+    profiler = game.profiler
+    result = {
+        'n': n,
+        'ticks': ticks,
+        'ticks_per_sec': ticks / elapsed,
+        'stages': {stage: profiler.mean(stage) for stage in profiler.samples
+                   if stage != Profiler.FRAME},
+        'peak_mib': None,
+    }
+    if memory:
+        tracemalloc.start()
+        try:
+            step(make_game(name, n, ticks, seed), name, ticks)
+            result['peak_mib'] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Returns a description of every regression against `baseline`."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None or base['n'] != result['n']:
+            continue
+        ratio = result['ticks_per_sec'] / base['ticks_per_sec']
+        if ratio < 1 - tolerance:
+            regressions.append(f'{name}: {result["ticks_per_sec"]:.0f} '
+                               f'ticks/s, {100 * (1 - ratio):.0f}% slower '
+                               f'than {base["ticks_per_sec"]:.0f}')
+        if result['peak_mib'] and base.get('peak_mib'):
+            growth = result['peak_mib'] / base['peak_mib']
+            if growth > 1 + tolerance:
+                regressions.append(f'{name}: {result["peak_mib"]:.1f} MiB '
+                                   f'peak, {100 * (growth - 1):.0f}% more '
+                                   f'than {base["peak_mib"]:.1f}')
+    return regressions
+
+
+def print_result(name, result, baseline=None, file=sys.stdout):
+    peak = result['peak_mib']
+    line = (f'{name:<12} {result["n"]:>7} {result["ticks_per_sec"]:>10.1f} '
+            f'{f"{peak:.1f}" if peak is not None else "-":>9}')
+    if baseline is not None and baseline['n'] == result['n']:
+        line += f' {result["ticks_per_sec"] / baseline["ticks_per_sec"]:>8.2f}x'
+    print(line, file=file)
+    stages = sorted(result['stages'].items(), key=lambda stage: -stage[1])
+    for stage, ms in stages:
+        print(f'    {stage:<28} {ms:>8.3f} ms', file=file)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('scenarios', nargs='*', default=list(SCENARIOS),
+                    help=f'Scenarios to run (default: all of '
+                         f'{", ".join(SCENARIOS)}).')
+    ap.add_argument('-n', '--count', type=int, default=None,
+                    help='Things per scenario (default: per scenario).')
+    ap.add_argument('-t', '--ticks', type=int, default=DEFAULT_TICKS)
+    ap.add_argument('-s', '--seed', type=int, default=0)
+    ap.add_argument('--no-memory', action='store_true',
+                    help='Skips the (slow) peak memory measurement.')
+    ap.add_argument('-b', '--baseline', default=DEFAULT_BASELINE,
+                    help='Compares with the results stored here.')
+    ap.add_argument('--save', action='store_true',
+                    help='Stores the results as the new baseline.')
+    ap.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    args = ap.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            ap.error(f'unknown scenario: {name}')
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f'{"scenario":<12} {"n":>7} {"ticks/s":>10} {"peak MiB":>9}'
+          f'{" vs base" if baseline else ""}')
+    results = {}
+    for name in args.scenarios:
+        n = args.count if args.count is not None else SCENARIOS[name][2]
+        results[name] = run_scenario(name, n, args.ticks, args.seed,
+                                     memory=not args.no_memory)
+        print_result(name, results[name], baseline.get(name))
+
+    if args.save:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'Saved baseline to {args.baseline}.')
+        return 0
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
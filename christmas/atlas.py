@@ -0,0 +1,125 @@
+import glob
+import hashlib
+import json
+import os
+
+import pygame as pg
+
+
+IMG_DIR = 'res/img'
+CACHE_DIR = '.cache/atlas'
+
+
+class SpriteAtlas:
+    """Every sprite at one scale factor, packed into a single surface.
+
+    Sprites are handed out as subsurfaces of the atlas, so they all share one
+    block of pixels that (given a display) is in the display's format.
+    Packed atlases are saved to `cache_dir`, keyed by a hash of the source
+    files, so later startups load one PNG instead of decoding and scaling
+    every sprite.
+    """
+    # Bump when the packing or the cache format changes.
+    VERSION = 1
+    MAX_WIDTH = 1024 # px
+
+    def __init__(self, surface, rects):
+        self.surface = surface
+        # Image path -> rect of the image in `surface`.
+        self.rects = rects
+        self._subsurfaces = {}
+
+    def __contains__(self, img_loc):
+        return os.path.normpath(img_loc) in self.rects
+
+    def get(self, img_loc):
+        img_loc = os.path.normpath(img_loc)
+        image = self._subsurfaces.get(img_loc)
+        if image is None:
+            image = self.surface.subsurface(self.rects[img_loc])
+            self._subsurfaces[img_loc] = image
+        return image
+
+    @staticmethod
+    def build(img_locs, scale_factor=None, cache_dir=CACHE_DIR):
+        """Returns the atlas of `img_locs`, from `cache_dir` if it's there."""
+        img_locs = sorted(os.path.normpath(img_loc) for img_loc in img_locs)
+        key = SpriteAtlas.cache_key(img_locs, scale_factor)
+        path = os.path.join(cache_dir, key)
+        try:
+            with open(path + '.json') as f:
+                rects = {img_loc: pg.Rect(rect)
+                         for img_loc, rect in json.load(f).items()}
+            surface = pg.image.load(path + '.png')
+        except (OSError, ValueError, pg.error):
+            surface, rects = SpriteAtlas.pack(img_locs, scale_factor)
+            SpriteAtlas._save(path, surface, rects)
+        if pg.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return SpriteAtlas(surface, rects)
+
+    @staticmethod
+    def cache_key(img_locs, scale_factor=None):
+        """Hashes the contents of `img_locs` along with how they're packed."""
+        digest = hashlib.sha1(f'{SpriteAtlas.VERSION}:{scale_factor}'.encode())
+        for img_loc in img_locs:
+            digest.update(img_loc.encode())
+            with open(img_loc, 'rb') as f:
+                digest.update(hashlib.sha1(f.read()).digest())
+        return digest.hexdigest()
+
+    @staticmethod
+    def pack(img_locs, scale_factor=None):
+        """Loads, scales and packs `img_locs` into shelves, tallest first.
+
+        Returns the atlas surface and the rect of each image in it.
+        """
+        images = {}
+        for img_loc in img_locs:
+            image = pg.image.load(img_loc)
+            if scale_factor:
+                image = pg.transform.scale(
+                            image,
+                            (image.get_width() * scale_factor,
+                             image.get_height() * scale_factor))
+            images[img_loc] = image
+        order = sorted(images, key=lambda img_loc: -images[img_loc].get_height())
+        width = max([SpriteAtlas.MAX_WIDTH] +
+                    [image.get_width() for image in images.values()])
+        rects = {}
+        x = y = shelf_height = 0
+        for img_loc in order:
+            w, h = images[img_loc].get_size()
+            if x + w > width:
+                # Start a new shelf.
+                x, y = 0, y + shelf_height
+                shelf_height = 0
+            rects[img_loc] = pg.Rect(x, y, w, h)
+            x += w
+            shelf_height = max(shelf_height, h)
+        surface = pg.Surface((width, max(y + shelf_height, 1)), pg.SRCALPHA)
+        surface.blits([(images[img_loc], rect)
+                       for img_loc, rect in rects.items()], doreturn=False)
+        return surface, rects
+
+    @staticmethod
+    def _save(path, surface, rects):
+        # Write to temporary files first, so that concurrent startups never
+        # see half a cache entry.  The cache is only an optimization, so
+        # failing to write it is fine.
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f'{path}.{os.getpid()}.tmp'
+            pg.image.save(surface, tmp + '.png')
+            with open(tmp + '.json', 'w') as f:
+                json.dump({img_loc: list(rect)
+                           for img_loc, rect in rects.items()}, f)
+            os.replace(tmp + '.png', path + '.png')
+            os.replace(tmp + '.json', path + '.json')
+        except (OSError, pg.error):
+            pass
+
+
+def sprite_paths(img_dir=IMG_DIR):
+    """Returns every sprite that goes in the atlases."""
+    return glob.glob(os.path.join(img_dir, '*.png'))
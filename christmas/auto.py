@@ -1,6 +1,5 @@
 from abc import ABC, abstractmethod
 import math
-import random
 
 
 class Auto(ABC):
@@ -22,7 +21,7 @@ class ReinforceAuto(Auto):
         t = eingan['t']
         if t % self.learn_stepcount == 0:
             self._learn()
-        return [random.random(), random.random()]
+        return list(eingan['rng'].random(2))
     def step(self, experience):
         pass
     def _learn(self):
@@ -41,7 +40,7 @@ class ManhattanAuto(Auto):
         self.memory['counter'] = counter + 1
         # Stick in straight line before counter cycles.
         if counter % ManhattanAuto.UPDATE_RATE != 0:
-            return
+            return update_vect
         # Move towards the opponent.
         pos = eingan['pos']
         # vel = eingan['vel']
@@ -0,0 +1,47 @@
+import numpy as np
+
+
+class ArrayBatch:
+    """Things kept as rows of parallel NumPy arrays rather than as objects.
+
+    Subclasses name their arrays in `ARRAYS`.  Only the first `count` rows
+    are live; the arrays double in size whenever they run out of room.
+    """
+    ARRAYS = ()
+
+    def _reserve(self, n):
+        """Makes room for `n` more rows, and returns the slice they go in."""
+        if self.count + n > len(getattr(self, self.ARRAYS[0])):
+            self._grow(self.count + n)
+        return slice(self.count, self.count + n)
+
+    def _compact(self, keep):
+        """Keeps only the live rows where `keep` is set, in order."""
+        live = slice(0, self.count)
+        n = int(keep.sum())
+        for name in self.ARRAYS:
+            arr = getattr(self, name)
+            arr[:n] = arr[live][keep]
+        self.count = n
+
+    def _grow(self, min_capacity):
+        capacity = len(getattr(self, self.ARRAYS[0]))
+        while capacity < min_capacity:
+            capacity *= 2
+        for name in self.ARRAYS:
+            arr = getattr(self, name)
+            setattr(self, name, np.resize(arr, (capacity,) + arr.shape[1:]))
+
+
+class BlitLayer:
+    """Something blitted over the screen every frame, and erased back to the
+    backdrop before the next.  Subclasses keep what they blitted in
+    `drawn_rects`.
+    """
+
+    def clear(self, screen, backdrop):
+        """Erases what was drawn last time.  Returns the rects erased."""
+        rects = self.drawn_rects
+        screen.blits([(backdrop, rect, rect) for rect in rects], doreturn=False)
+        self.drawn_rects = []
+        return rects
@@ -8,7 +8,7 @@ from .component import *
 from .dialog import DialogFrame
 from .entity import Entity
 from .image import load_images
-from .input_handler import TOP_PLAYER_INPUT_CONFIG
+from .input_handler import TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT
 from .player import Player, MoveOption
 from .projectile import BallsProjectile, FootballProjectile, JointProjectile
 
@@ -46,6 +46,7 @@ class Benjamin:
         MoveOption('CHAD TOSSER', 'A big ole football because this guy IS GOOD AT SPORTS.', _init_chad_tosser_move),
         MoveOption('THE JOINT', 'Devil\'s Lettuce is especially devilish today.', _init_the_joint_move),
     ]
+    PROJECTILES = [BallsProjectile, FootballProjectile, JointProjectile]
 
     @staticmethod
     def init(entity, x, y, pos_bounds):
@@ -53,5 +54,5 @@ class Benjamin:
                     Benjamin.NAME, Benjamin.QUOTES, Benjamin.MOVES,
                     Benjamin.MUG_SPRITES)
         entity.add_comp(TopPlayerComp())
-        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG))
+        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT))
         entity.add_comp(BenjaminFlag())
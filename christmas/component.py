@@ -27,14 +27,24 @@ SizeComp = namedtuple('SizeComp', ['w', 'h'])
 class LifetimeComp:
     def __init__(self, life):
         self.life = life
+        self.lifetime = life
+    def reset(self):
+        self.life = self.lifetime
 
 class AmmoComp:
     def __init__(self):
         self.rounds = deque()
+        # Prompt of the move that loaded the rounds
+        self.move = None
 
 OwnerComp = namedtuple('OwnerComp', ['owner'])
 
-InputConfigComp = namedtuple('InputConfigComp', ['key_map'])
+MoveComp = namedtuple('MoveComp', ['name'])
+
+# `EntityPool` that a pooled entity goes back to when it dies
+PoolComp = namedtuple('PoolComp', ['pool'])
+
+InputConfigComp = namedtuple('InputConfigComp', ['key_map', 'slot'])
 
 class PlayerComp:
     MAX_HEALTH = 10
@@ -63,34 +73,71 @@ PositionBoundBounceMultiplierComp = namedtuple(
 class OutOfBoundsComp(pg.Rect): pass
 
 class DrawComp(pg.sprite.Sprite):
+    # The clock of every sprite animated alike, if animated.
+    clock = None
+    # Frames ahead of `clock`, only stored for sprites out of step with it
+    # (e.g., ones that started animating after it did).
+    phase = 0
+
     def __init__(self, images):
         pg.sprite.Sprite.__init__(self, self.groups)
-        if not isinstance(images, list):
+        if isinstance(images, pg.Surface):
             images = [images]
         self.images = images
-        self.img_idx = 0
-        self.image = self.images[self.img_idx]
         self.rect = self.image.get_rect()
+    @property
+    def img_idx(self):
+        frame = self.clock.frame if self.clock is not None else 0
+        return (frame + self.phase) % len(self.images)
+    @img_idx.setter
+    def img_idx(self, idx):
+        frame = self.clock.frame if self.clock is not None else 0
+        phase = (idx - frame) % len(self.images)
+        if phase or 'phase' in vars(self):
+            self.phase = phase
+    @property
+    def image(self):
+        # Looked up when drawn, so animating never touches the sprite.
+        return self.images[self.img_idx]
+    def set_clock(self, clock):
+        """Animates on `clock`, carrying on from the current frame."""
+        img_idx = self.img_idx
+        self.clock = clock
+        self.img_idx = img_idx
+    def reset(self):
+        self.img_idx = 0
 
 class AnimateComp:
     def __init__(self, delay=1.0):
-        self.clock = 0
         self.delay = delay
 
-SnowTargetComp = namedtuple('SnowTargetComp', ['x', 'y'])
+class AnimationClock:
+    """Frame clock shared by every sprite with the same images and delay."""
+    def __init__(self, images, delay):
+        # Kept so that the images' id, which keys the clock, isn't reused.
+        self.images = images
+        self.delay = delay
+        self.clock = 0
+        # Frames shown so far.
+        self.frame = 0
+    def tick(self):
+        if self.clock >= self.delay:
+            self.frame += 1
+            self.clock = 0
+        self.clock += 1
 
 class MemoryComp:
     def __init__(self, memory=dict()):
         self.memory = memory
 
 class JobScheduleComp:
-    def __init__(self, f, period, std_dev):
+    def __init__(self, f, period, std_dev, rng):
         self.f = f
         self.period = period
         self.std_dev = std_dev
-        self.reset()
-    def reset(self, t=0):
-        self.tick_time = np.random.normal(t + self.period, self.std_dev)
+        self.reset(rng)
+    def reset(self, rng, t=0):
+        self.tick_time = rng.normal(t + self.period, self.std_dev)
 
 ItemComp = namedtuple('ItemTypeComp', [])
 
@@ -141,4 +188,6 @@ class VelocityAttenuateFlag: pass
 
 class OutOfBoundsKillFlag: pass
 
-class DeadFlag: pass
\ No newline at end of file
+class DeadFlag: pass
+
+class BotFlag: pass
\ No newline at end of file
@@ -0,0 +1,52 @@
+import pygame as pg
+
+
+class Compositor:
+    """Bakes the static layers of the scene into one cached surface.
+
+    Each layer is a function that draws onto the surface it's given, and
+    layers are drawn in the order they were added.  The baked surface is only
+    redrawn after the layout changes (see `invalidate`), so the background
+    costs a single blit however much scenery it holds.  Anything that changes
+    during play is drawn on top of it instead.
+    """
+
+    def __init__(self, w, h):
+        self.w = w
+        self.h = h
+        # Layer name -> draw function, in drawing order.
+        self.layers = {}
+        self.surface = None
+        # Bumped every time the layers are baked.
+        self.version = 0
+
+    def add_layer(self, name, draw):
+        """Adds (or replaces) the layer `name`, drawn by `draw(surface)`."""
+        self.layers[name] = draw
+        self.invalidate()
+
+    def remove_layer(self, name):
+        del self.layers[name]
+        self.invalidate()
+
+    def resize(self, w, h):
+        self.w = w
+        self.h = h
+        self.invalidate()
+
+    def invalidate(self):
+        """Marks the baked surface stale, so it's redrawn on next use."""
+        self.surface = None
+
+    def is_valid(self):
+        return self.surface is not None
+
+    def bake(self):
+        """Returns the surface with every layer drawn, redrawing it if stale."""
+        if self.surface is None:
+            surface = pg.Surface((self.w, self.h))
+            for draw in self.layers.values():
+                draw(surface)
+            self.surface = surface
+            self.version += 1
+        return self.surface
@@ -8,7 +8,7 @@ from .component import *
 from .dialog import DialogFrame
 from .entity import Entity
 from .image import load_images
-from .input_handler import TOP_PLAYER_INPUT_CONFIG
+from .input_handler import TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT
 from .player import Player, MoveOption
 from .projectile import RockPileProjectile, GiftOfLifeProjectile, MrSpoonProjectile
 
@@ -46,6 +46,7 @@ class DeAnne:
         MoveOption('THE GIFT OF LIFE', 'Creates another testosterone-filled Weber.', _init_the_gift_of_life_move),
         MoveOption('NEXT WEEK', 'Imma knock you into next week. Only this time, I mean it.', _init_next_week_move),
     ]
+    PROJECTILES = [RockPileProjectile, GiftOfLifeProjectile, MrSpoonProjectile]
 
     @staticmethod
     def init(entity, x, y, pos_bounds):
@@ -53,5 +54,5 @@ class DeAnne:
                     DeAnne.NAME, DeAnne.QUOTES, DeAnne.MOVES,
                     DeAnne.MUG_SPRITES)
         entity.add_comp(TopPlayerComp())
-        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG))
+        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT))
         entity.add_comp(DeAnneFlag())
\ No newline at end of file
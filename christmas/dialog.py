@@ -2,6 +2,7 @@ from collections import deque
 
 from .color import *
 from .component import *
+from .text import render_text
 from .util import DrawRect
 
 FG_COLOR = BLACK
@@ -17,6 +18,8 @@ class DialogWindow:
         self.screen_region = DrawRect(0, window_top, screen_width, DialogWindow.HEIGHT, bg_color)
         self.font = font
         self.frame = EmptyFrame()
+        # Whether the window needs to be redrawn
+        self.dirty = True
 
     def update(self):
         self.frame.update(self.screen_region)
@@ -24,10 +27,12 @@ class DialogWindow:
     def draw(self, screen):
         self.screen_region.draw(screen)
         self.frame.draw(self.font, self.screen_region, screen)
+        self.dirty = False
 
     def set_frame(self, frame):
         self.frame.destroy()
         self.frame = frame
+        self.dirty = True
 
     def get_rect(self):
         return self.screen_region
@@ -63,13 +68,13 @@ class EmptyFrame:
 
 class BasicTextFrame(DialogFrame):
     def __init__(self, text):
-        self.text = text
+        self.text = text.upper()
 
     def update(self, region):
         pass
 
     def draw(self, font, region, screen):
-        dialog = font.render(self.text.upper(), 1, FG_COLOR)
+        dialog = render_text(font, self.text, FG_COLOR)
         dialog_rect = dialog.get_rect(center=region.center)
         screen.blit(dialog, dialog_rect)
 
@@ -88,16 +93,18 @@ class MugTextFrame(DialogFrame):
         self.mug.add_comp(DrawComp(player.get_comp(PlayerComp).mug_sprites))
         self.mug.add_comp(PositionComp(0, 0))
         self.mug.add_comp(AnimateComp(MugTextFrame.DEFAULT_ANIM_DELAY))
-        self.text = text
+        self.text = text.upper()
 
     def update(self, region):
         pos = self.mug.get_comp(PositionComp)
         draw = self.mug.get_comp(DrawComp)
         pos.x = MugTextFrame.MUG_LEFT_X_PAD
         pos.y = region.centery - draw.rect.h / 2
+        # The mug doesn't move, it's just put in place.
+        self.game.snap_entity(self.mug)
 
     def draw(self, font, region, screen):
-        dialog = font.render(self.text.upper(), 1, FG_COLOR)
+        dialog = render_text(font, self.text, FG_COLOR)
         mugshot_x_offs = self.mug.get_comp(PositionComp).x
         mugshot_x_offs += MugTextFrame.MUG_LEFT_X_PAD + self.mug.get_comp(DrawComp).rect.w
         mugshot_x_offs += MugTextFrame.MUG_RIGHT_X_PAD
@@ -1,5 +1,4 @@
 from enum import Enum
-import random
 
 from .ben import Benjamin
 from .component import *
@@ -41,7 +40,7 @@ class BeginState(State):
         self.game = game
         self.remaining_time = BeginState.STATE_DURATION
         # Choose starting player.
-        self.player = random.choice([game.get_top_player(), game.get_bottom_player()])
+        self.player = game.rng.choice([game.get_top_player(), game.get_bottom_player()])
 
     def update(self):
         self.remaining_time -= 1
@@ -80,7 +79,7 @@ class TurnQuoteState(State):
         self.game = game
         self.player = player
         self.game.dialog_window.set_frame(
-            MugTextFrame(self.game, self.player, random.choice(self.player.get_comp(PlayerComp).quotes)))
+            MugTextFrame(self.game, self.player, self.game.rng.choice(self.player.get_comp(PlayerComp).quotes)))
         self.remaining_time = TurnQuoteState.STATE_DURATION
 
     def update(self):
@@ -106,12 +105,18 @@ class MoveSelectState(State):
         self.game.dialog_window.set_frame(MugTextFrame(self.game, self.player, frame_text))
 
     def update(self):
+        if self.player.has_comp(BotFlag):
+            self.chosen_move = self.game.choose_bot_move(self.player)
+            self.finished = True
+            return
         inp_handler = self.game.get_input_handler()
         inp_conf = self.player.get_comp(InputConfigComp)
-        keys_down = list(map(lambda k: inp_handler.is_key_down(k), self.choice_keys))
-        if any(keys_down):
-            self.chosen_move = self.moves[keys_down.index(True)]
-            self.finished = True
+        held = inp_handler.get_held(inp_conf.slot)
+        for intent, move in zip(CHOICE_INTENTS, self.moves):
+            if held & intent.bit:
+                self.chosen_move = move
+                self.finished = True
+                return
 
     def is_finished(self):
         return self.finished
@@ -130,6 +135,8 @@ class BeginMoveState(State):
         self.remaining_time = BeginMoveState.STATE_DURATION
         self.game.dialog_window.set_frame(MugTextFrame(self.game, self.player, self.move.description))
         self.move.move_init(player)
+        if player.has_comp(AmmoComp):
+            player.get_comp(AmmoComp).move = self.move.prompt
 
     def update(self):
         self.remaining_time -= 1
@@ -1,26 +1,39 @@
+import heapq
+
+import numpy as np
 import pygame as pg
 
 from .component import DrawComp, DeadFlag
 
 
 class Entity:
-    def __init__(self, ident):
+    def __init__(self, ident, generation=0, index=None, store=None):
         self.ident = ident
+        self.generation = generation
         self.comps = {}
+        # `QueryIndex` that is told about every component change, so systems
+        # can read their matching entities without scanning.
+        self.index = index
+        # Optional `ColumnStore` that keeps the data of some component types.
+        self.store = store
 
     def kill(self):
         self.add_comp(DeadFlag())
 
     def add_comp(self, comp):
-        comp_type = type(comp)
+        comp_type = Entity._comp_type(comp)
         assert(not self.has_comp(comp_type))
+        if self.store is not None and self.store.is_stored(comp_type):
+            comp = self.store.attach(self, comp)
         self.comps[comp_type] = comp
+        if self.index is not None:
+            self.index.comp_added(self, comp_type)
 
     def set_comp(self, comp):
-        comp_type = type(comp)
+        comp_type = Entity._comp_type(comp)
         if self.has_comp(comp_type):
             self.remove_comp(comp_type)
-        self.comps[comp_type] = comp
+        self.add_comp(comp)
 
     def remove_comp(self, comp_type):
         assert(self.has_comp(comp_type))
@@ -29,7 +42,11 @@ class Entity:
             # Need to manually kill dead sprites, or else they will
             # continue to be drawn.
             comp.kill()
+        if self.store is not None and self.store.is_stored(comp_type):
+            self.store.detach(self, comp_type)
         del self.comps[comp_type]
+        if self.index is not None:
+            self.index.comp_removed(self, comp_type)
 
     def has_comp(self, comp_type):
         return comp_type in self.comps
@@ -52,3 +69,163 @@ class Entity:
 
     def get_comps(self, *comps):
         return tuple(self.comps[comp] for comp in comps)
+
+    @staticmethod
+    def _comp_type(comp):
+        # Column store views stand in for the component type they view.
+        return getattr(type(comp), 'COMP_TYPE', type(comp))
+
+
+class QueryIndex:
+    """Keeps a live set of matching entities for each registered query.
+
+    A query is a sequence of component types, and an entity matches it when it
+    has all of them.  Entities report component changes through
+    `comp_added`/`comp_removed`, so only the queries that mention the changed
+    component type get touched.
+    """
+
+    def __init__(self):
+        # Query key -> matching entities.  Dicts are used as insertion-ordered
+        # sets, so systems see entities in the order they started matching.
+        self.matches = {}
+        # Component type -> keys of the queries that mention it.
+        self.queries_by_comp = {}
+        # Query key -> array of matching entity slots, dropped whenever the
+        # query's membership changes.
+        self.slot_cache = {}
+
+    def register(self, comps, entities=()):
+        """Registers the query for `comps` and returns its key.
+
+        `entities` are the entities that already exist, which get matched
+        against the new query.
+        """
+        key = tuple(comps)
+        if key in self.matches:
+            return key
+        self.matches[key] = {entity: None for entity in entities
+                             if entity is not None and
+                             QueryIndex._is_match(entity, key)}
+        for comp_type in key:
+            self.queries_by_comp.setdefault(comp_type, []).append(key)
+        return key
+
+    def get(self, key):
+        return self.matches[key]
+
+    def get_slots(self, key):
+        """Returns the slots of the entities matching `key` as an array.
+
+        The array is cached until the query's membership changes, so callers
+        can also use its identity to tell whether membership has changed.
+        """
+        slots = self.slot_cache.get(key)
+        if slots is None:
+            slots = np.fromiter((entity.ident for entity in self.matches[key]),
+                                dtype=int, count=len(self.matches[key]))
+            self.slot_cache[key] = slots
+        return slots
+
+    def comp_added(self, entity, comp_type):
+        for key in self.queries_by_comp.get(comp_type, ()):
+            if QueryIndex._is_match(entity, key):
+                self.matches[key][entity] = None
+                self.slot_cache.pop(key, None)
+
+    def comp_removed(self, entity, comp_type):
+        for key in self.queries_by_comp.get(comp_type, ()):
+            if self.matches[key].pop(entity, False) is None:
+                self.slot_cache.pop(key, None)
+
+    def add(self, entity):
+        """Adds `entity` to every query it matches, e.g. after `remove`."""
+        for comp_type in entity.comps:
+            self.comp_added(entity, comp_type)
+
+    def remove(self, entity):
+        """Drops `entity` from every query it matches."""
+        for comp_type in entity.comps:
+            self.comp_removed(entity, comp_type)
+
+    @staticmethod
+    def _is_match(entity, key):
+        return all(comp_type in entity.comps for comp_type in key)
+
+
+class EntityAllocator:
+    """Generational index allocator for entities.
+
+    Freed slots are reused, lowest first, so the slot list stays as long as
+    the peak number of live entities rather than growing with every entity
+    ever created.  Each slot has a generation that is bumped when its entity
+    is freed, which lets stale `Entity` references be told apart from the
+    slot's current occupant.
+    """
+
+    def __init__(self):
+        # Slot -> live entity, or `None` for a free slot.
+        self.entities = []
+        # Slot -> current generation.  Never shrinks, so a slot that gets
+        # trimmed and later re-grown keeps counting up.
+        self.generations = []
+        # Min-heap of free slots.  May hold slots that have since been trimmed
+        # or re-occupied; those are skipped when popped.
+        self.free_slots = []
+        self.live_count = 0
+
+    def alloc(self, index=None, store=None):
+        slot = self._take_slot()
+        result = Entity(slot, self.generations[slot], index, store)
+        self.entities[slot] = result
+        self.live_count += 1
+        return result
+
+    def revive(self, entity):
+        """Gives a freed `entity` a new slot, keeping its components.
+
+        Any references to the entity from its previous life will see it as
+        alive again, so only revive entities nothing else holds on to.
+        """
+        assert(not self.is_alive(entity))
+        slot = self._take_slot()
+        entity.ident = slot
+        entity.generation = self.generations[slot]
+        self.entities[slot] = entity
+        self.live_count += 1
+
+    def free(self, entity):
+        assert(self.is_alive(entity))
+        slot = entity.ident
+        self.entities[slot] = None
+        self.generations[slot] += 1
+        self.live_count -= 1
+        heapq.heappush(self.free_slots, slot)
+        self.compact()
+
+    def is_alive(self, entity):
+        """Returns whether `entity` still occupies its slot."""
+        return (entity.ident < len(self.entities) and
+                entity.generation == self.generations[entity.ident] and
+                self.entities[entity.ident] is entity)
+
+    def compact(self):
+        """Trims free slots off the end of the slot list."""
+        while self.entities and self.entities[-1] is None:
+            self.entities.pop()
+
+    def _take_slot(self):
+        slot = self._pop_free_slot()
+        if slot is None:
+            slot = len(self.entities)
+            self.entities.append(None)
+            if slot == len(self.generations):
+                self.generations.append(0)
+        return slot
+
+    def _pop_free_slot(self):
+        while self.free_slots:
+            slot = heapq.heappop(self.free_slots)
+            if slot < len(self.entities) and self.entities[slot] is None:
+                return slot
+        return None
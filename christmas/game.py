@@ -1,4 +1,4 @@
-import random
+import time
 
 from pygame.locals import *
 import pygame as pg
@@ -6,24 +6,37 @@ import pygame as pg
 from .ben import Benjamin
 from .color import *
 from .component import *
+from .compositor import Compositor
 from .dee import DeAnne
 from .dialog import DialogWindow
 from .director import Director
-from .entity import Entity
+from .entity import EntityAllocator, QueryIndex
 from .globe import SnowGlobe
+from .image import ASSETS
 from .input_handler import InputHandler
 from .janic import Janicolous
 from .josh import Joshua
 from .logan import Logan
 from .luke import Lucas
+from .particle import ParticleField
 from .player import Player
+from .pool import EntityPool
+from .profiler import Profiler
 from .projectile import Projectile
+from .replay import Replay
+from .rng import Rng
 from .rob import Robert
 from .santa import Santa
 from .sound import Sound, SoundType
+from .stats import MatchStats
+from .storage import ColumnStore
 from .system import *
+from .text import render_text
 from .util import DrawRect
 
+# Simulation ticks per second.  Every frame counter (lifetimes, animation
+# delays, director state durations) counts these ticks, however fast frames
+# are rendered.
 FPS = 30
 
 
@@ -32,13 +45,85 @@ class Game:
     TITLE = 'Another Ordinary Weber Christmas'
     FG_COLOR = GRAY
     BG_COLOR = WHITE
+    # Past this many dirty rects per frame, the whole screen is sent instead.
+    MAX_DIRTY_RECTS = 500
+    # Model that moves bot-controlled players without one of their own.
+    BOT_AUTO = 'manhattan'
+    # Frames between refreshes of the profiler overlay.
+    PROFILE_OVERLAY_PERIOD = 15
+    # Frames rendered per second, at most.
+    RENDER_FPS = 60
+    # Most ticks simulated per frame when running behind.  Past this, the
+    # game slows down rather than spending ever longer catching up.
+    MAX_CATCH_UP_TICKS = 5
+    WEBERS = [
+        Benjamin,
+        DeAnne,
+        Janicolous,
+        Joshua,
+        Logan,
+        Lucas,
+        Robert
+    ]
+
+    def __init__(self, width, height, debug_mode=False, columnar=True,
+                 headless=False, max_ticks=None, bots=None, weber=None,
+                 top_move=None, seed=None, profile=None,
+                 render_fps=RENDER_FPS, record=None):
+        """
+        `headless` runs the simulation without a window, fonts, audio or input,
+        and as fast as possible.  `max_ticks` ends the game after that many
+        ticks.  `bots` has the game pick moves and fire for both players, and
+        defaults to `headless`.
+
+        `weber` names the Weber to fight Santa (random by default), and
+        `top_move` is the index of the only move their bot picks.
+
+        `seed` seeds all of the game's randomness, so that a seeded game can
+        be played again exactly.  A fresh seed is used by default.
+
+        Each stage of the frame is timed in `debug_mode`, and shown over the
+        game.  `profile` also times them, and writes every frame's timings
+        to that path (.csv or .json) when the game ends.
 
-    def __init__(self, width, height, debug_mode=False):
+        The simulation always runs at `FPS` ticks per second, while frames
+        are rendered at up to `render_fps` per second (0 for no limit), with
+        movement interpolated between ticks.
+
+        `record` saves a `Replay` of the game to that path when it ends.  See
+        `from_replay` to play one back.
+        """
         self._debug_mode = debug_mode
         self.width = width
         self.height = height
+        self.headless = headless
+        self.render_fps = render_fps
+        self.max_ticks = max_ticks
+        self.bots = headless if bots is None else bots
+        self.ticks = 0
+        self.weber = weber
+        self.top_move = top_move
+        self.stats = MatchStats()
+        self.profile = profile
+        self.record = record
+        self.replay = None
+        self.profiler = Profiler(enabled=debug_mode or profile is not None,
+                                 trace=profile is not None)
+        self.rng = Rng(seed)
+        # Cosmetic randomness gets its own stream, so that whether it's drawn
+        # (e.g., headless or not) can't change the simulation.
+        self.fx_rng = self.rng.spawn()
+        self.allocator = EntityAllocator()
+        self.query_index = QueryIndex()
+        # Keeps positions and velocities in NumPy columns, so the systems that
+        # touch them can update every entity at once.
+        self.store = ColumnStore() if columnar else None
+        # Archetype -> pool of its dead entities, for archetypes that can be
+        # reset (see `spawn`).
+        self.pools = {}
+        self.animate_update_system = AnimateUpdateSystem(self)
+        self.draw_update_system = DrawUpdateSystem(self)
         self.systems = [
-            SnowParticleUpdateSystem(self),
             ScheduleSystem(self),
             ParticleSystem(self),
             PlayerUpdateSystem(self),
@@ -52,20 +137,25 @@ class Game:
             OutOfBoundsCleanupSystem(self),
             DeadCleanupSystem(self),
             PlayerAnimateUpdateSystem(self),
-            AnimateUpdateSystem(self),
-            DrawUpdateSystem(self),
-        ]
-        self.webers = [
-            Benjamin,
-            DeAnne,
-            Janicolous,
-            Joshua,
-            Logan,
-            Lucas,
-            Robert
+            self.animate_update_system,
+            self.draw_update_system,
         ]
-        self.entities = []
-        self.input_handler = InputHandler()
+        self.webers = list(Game.WEBERS)
+        # Headless games have no events to read, but can be fed input.
+        self.input_handler = InputHandler(poll_events=not headless)
+
+    @staticmethod
+    def from_replay(replay, **kwargs):
+        """Returns a game that plays `replay` back.
+
+        Takes the same keyword arguments as the constructor, except for those
+        that the replay sets.
+        """
+        game = Game(replay.width, replay.height, bots=replay.bots,
+                    weber=replay.weber, top_move=replay.top_move,
+                    seed=replay.seed, max_ticks=replay.ticks, **kwargs)
+        game.replay = replay
+        return game
 
     def start(self):
         """Let the sin... begin."""
@@ -73,17 +163,30 @@ class Game:
         self.run()
 
     def init(self):
-        pg.init()
+        if self.headless:
+            # Nothing is ever shown, so draw into a plain surface.
+            self.screen = pg.Surface((self.width, self.height))
+            self.font = None
+        else:
+            pg.init()
+
+            # Window
+            self.screen = pg.display.set_mode((self.width, self.height))
+            pg.display.set_caption(Game.TITLE)
+            pg.mouse.set_visible(False)
+            self.font = pg.font.Font('res/font/8-bitpusab.ttf', 10)
+            self.clock = pg.time.Clock()
+
+        # Load this match's characters in the background while everything
+        # else starts up.  This waits for the window, so that the sprites get
+        # converted to its pixel format.
+        weber = self.get_weber()
+        ASSETS.preload_character(weber)
+        ASSETS.preload_character(Santa)
 
         # Game Music and Sound
-        self.sound = Sound(debug_mode=self._debug_mode)
-
-        # Window
-        self.screen = pg.display.set_mode((self.width, self.height))
-        pg.display.set_caption(Game.TITLE)
-        pg.mouse.set_visible(False)
-        self.font = pg.font.Font('res/font/8-bitpusab.ttf', 10)
-        self.clock = pg.time.Clock()
+        self.sound = Sound(self.fx_rng, debug_mode=self._debug_mode,
+                           muted=self.headless)
 
         # Compute player/dialog regions.
         # NB: The dialog window is between the top region and the bottom region.
@@ -109,11 +212,11 @@ class Game:
         # Initialize a Weber.
         weber_x, weber_y = self.top_region.center
         self.top_player = self.create_entity()
-        random.choice(self.webers).init(self.top_player, weber_x, weber_y, \
-                                        self.top_region)
+        weber.init(self.top_player, weber_x, weber_y, self.top_region)
         weber_pos = self.top_player.get_comp(PositionComp)
         weber_pos.x -= self.top_player.get_comp(SizeComp).w / 2
         weber_pos.y -= self.top_player.get_comp(SizeComp).h / 2
+        self.snap_entity(self.top_player)
 
         # Initialize Santa.
         santa_x, santa_y = self.bottom_region.center
@@ -122,6 +225,18 @@ class Game:
         santa_pos = self.bottom_player.get_comp(PositionComp)
         santa_pos.x -= self.bottom_player.get_comp(SizeComp).w / 2
         santa_pos.y -= self.bottom_player.get_comp(SizeComp).h / 2
+        self.snap_entity(self.bottom_player)
+
+        if self.bots:
+            for player in (self.top_player, self.bottom_player):
+                player.add_comp(BotFlag())
+                if not player.has_comp(AutoComp):
+                    player.add_comp(AutoComp(Game.BOT_AUTO))
+
+        if self.replay is not None:
+            self.input_handler.play(self.replay.intents)
+        if self.record is not None:
+            self.input_handler.start_recording()
 
         # The director needs to be initted *after* the players have been
         # initted.
@@ -129,61 +244,318 @@ class Game:
 
         # Create ornament spawning job, as system.
         ornament_job_entity = self.create_entity()
-        ornament_job_entity.add_comp(JobScheduleComp('spawn_orn', 30000, 2000))
+        ornament_job_entity.add_comp(JobScheduleComp('spawn_orn', 30000, 2000,
+                                                     self.rng))
         beer_job_entity = self.create_entity()
-        beer_job_entity.add_comp(JobScheduleComp('spawn_beer', 60000, 10000))
+        beer_job_entity.add_comp(JobScheduleComp('spawn_beer', 60000, 10000,
+                                                 self.rng))
 
         # Initialize snowglobe.
-        self.globe = SnowGlobe(self.width, self.height, self.create_entity, \
-                               debug_mode=self._debug_mode)
+        self.globe = SnowGlobe(self.width, self.height, self.fx_rng, \
+                               debug_mode=self._debug_mode,
+                               headless=self.headless)
+        # Cosmetic particles, emitted by the particle system.
+        self.particles = ParticleField(self.fx_rng)
+
+        # Static scenery, baked into a single background surface.
+        self.compositor = Compositor(self.width, self.height)
+        self.compositor.add_layer('top_region', self.top_region.draw)
+        self.compositor.add_layer('dialog', self.dialog_window.get_rect().draw)
+        self.compositor.add_layer('bottom_region', self.bottom_region.draw)
+        self.compositor.add_layer('ground', self.draw_ground)
+
+        if not self.headless:
+            self.init_render()
 
     def run(self):
-        while True:
+        if self.headless:
+            while not self.is_finished():
+                self.step()
+                self.profiler.end_frame()
+        else:
+            self.run_realtime()
+        if self.profile is not None:
+            self.profiler.dump(self.profile)
+        if self.record is not None:
+            intents = self.input_handler.stop_recording()
+            Replay.from_game(self, intents).save(self.record)
+        if not self.headless:
+            pg.quit()
+
+    def run_realtime(self):
+        """Ticks at `FPS` on the wall clock, rendering as often as allowed.
+
+        Real time accumulates between frames and is spent in whole ticks, and
+        each frame is drawn the fraction of a tick that's left over past the
+        last one.
+        """
+        tick_time = 1 / FPS
+        accumulator = 0.0
+        last_time = time.perf_counter()
+        while not self.is_finished():
+            now = time.perf_counter()
+            accumulator += now - last_time
+            last_time = now
+            if accumulator > Game.MAX_CATCH_UP_TICKS * tick_time:
+                accumulator = Game.MAX_CATCH_UP_TICKS * tick_time
+            while accumulator >= tick_time and not self.is_finished():
+                self.step()
+                if self.input_handler.is_close_requested():
+                    return
+                accumulator -= tick_time
+
+            with self.profiler.time('render'):
+                self.render(accumulator / tick_time)
+            with self.profiler.time('idle'):
+                self.clock.tick(self.render_fps)
+            self.profiler.end_frame()
+
+    def step(self):
+        """Advances the simulation by one tick."""
+        if self.store is not None:
+            self.store.save_positions()
+        # Input is read once per tick, so that no tick misses a key press,
+        # however many frames there are per tick.
+        with self.profiler.time('input'):
             self.input_handler.update()
-            if self.input_handler.is_close_requested():
-                # End game loop.
-                break
-
+        with self.profiler.time('director'):
             self.director.update()
+        with self.profiler.time('dialog'):
             self.dialog_window.update()
-            # Run systems.
-            for system in self.systems:
+        # Run systems.
+        for system in self.systems:
+            with self.profiler.time(type(system).__name__):
                 system.run()
+        if not self.headless:
+            # Snow is purely cosmetic.
+            with self.profiler.time('snow'):
+                self.globe.update(1 / FPS)
+        self.ticks += 1
+
+    def init_render(self):
+        """Builds the layers that dirty-rect rendering restores from."""
+        # Static environment.
+        self.background = self.compositor.bake()
+        # Environment plus the HUD and dialog text, which is what sprites get
+        # drawn over and cleared back to.
+        self.backdrop = self.background.copy()
+        # Player -> (drawn stats, rect they were drawn in).
+        self.drawn_stats = {}
+        # The profiler overlay, and where it was last drawn.
+        self.profile_overlay = None
+        self.profile_rect = None
+        self.frames_since_overlay = 0
+        self.full_redraw = True
+
+    def render(self, alpha=1.0):
+        """Draws the game `alpha` of the way from the last tick to the next."""
+        if not self.compositor.is_valid():
+            # The scenery changed, so start over from a fresh background.
+            self.init_render()
+        dirty_rects = []
+        if self.full_redraw:
+            self.screen.blit(self.backdrop, (0, 0))
+            dirty_rects.append(self.screen.get_rect())
+        else:
+            # Erase entities where they were last drawn.
+            self.sprite_group.clear(self.screen, self.backdrop)
+        if self.profile_rect is not None:
+            self.screen.blit(self.backdrop, self.profile_rect, self.profile_rect)
+            dirty_rects.append(self.profile_rect)
+        dirty_rects += self.globe.clear(self.screen, self.backdrop)
+        dirty_rects += self.particles.clear(self.screen, self.backdrop)
+
+        # Redraw only the HUD and dialog areas that changed.
+        if self.dialog_window.dirty or self.full_redraw:
+            dirty_rects.append(self.redraw_backdrop(
+                                    self.dialog_window.get_rect(),
+                                    self.dialog_window.draw))
+        for player in (self.top_player, self.bottom_player):
+            rect = self.redraw_stats(player)
+            if rect is not None:
+                dirty_rects.append(rect)
+        dirty_rects += self.globe.draw(self.screen,
+                                       (self.background, self.backdrop))
+
+        # Draw entities, which returns both their old and new rects.
+        self.draw_update_system.interpolate(alpha)
+        dirty_rects += self.sprite_group.draw(self.screen)
+        dirty_rects += self.particles.draw(self.screen, alpha)
+
+        if self._debug_mode:
+            dirty_rects.append(self.draw_profile())
+
+        # Send only the changed areas to the screen, unless there are so many
+        # that a full flip is cheaper.
+        with self.profiler.time('flip'):
+            if self.full_redraw or len(dirty_rects) > Game.MAX_DIRTY_RECTS:
+                pg.display.flip()
+                self.full_redraw = False
+            else:
+                pg.display.update(dirty_rects)
+        self.sound.update()
+
+    def draw_profile(self):
+        """Draws the profiler overlay over everything else.
+
+        The overlay is only re-rendered every `PROFILE_OVERLAY_PERIOD` frames.
+        Returns the rect drawn.
+        """
+        self.frames_since_overlay += 1
+        if (self.profile_overlay is None or
+                self.frames_since_overlay >= Game.PROFILE_OVERLAY_PERIOD):
+            self.frames_since_overlay = 0
+            self.profile_overlay = self.profiler.render(
+                                       self.font, Game.FG_COLOR, Game.BG_COLOR)
+        self.profile_rect = self.screen.blit(self.profile_overlay, (5, 5))
+        return self.profile_rect
+
+    def draw_ground(self, surface):
+        surface.blit(self.globe.ground, (0, 0))
+
+    def redraw_backdrop(self, rect, draw):
+        """Redraws `rect` of the backdrop with `draw` and copies it to screen.
+
+        `draw` is called with the backdrop, after `rect` has been reset to the
+        background.  Returns the rect that changed.
+        """
+        rect = pg.Rect(rect)
+        self.backdrop.blit(self.background, rect, rect)
+        draw(self.backdrop)
+        self.screen.blit(self.backdrop, rect, rect)
+        return rect
 
-            # Draw game environment.
-            self.top_region.draw(self.screen)
-            self.dialog_window.draw(self.screen)
-            self.bottom_region.draw(self.screen)
-            self.draw_stats(self.top_player)
-            self.draw_stats(self.bottom_player)
-            self.globe.shake()
+    def redraw_stats(self, player):
+        """Redraws the stats of `player` if they've changed since last time.
 
-            # Draw entities.
-            self.sprite_group.draw(self.screen)
+        Returns the rect that changed, or `None`.
+        """
+        player_comp = player.get_comp(PlayerComp)
+        stats = (player_comp.curr_health, player_comp.max_health,
+                 player_comp.curr_power, player_comp.max_power,
+                 player_comp.curr_drunkenness, player_comp.max_drunkenness)
+        drawn_stats, drawn_rect = self.drawn_stats.get(player, (None, None))
+        if stats == drawn_stats and not self.full_redraw:
+            return None
+        if drawn_rect is not None:
+            self.backdrop.blit(self.background, drawn_rect, drawn_rect)
+        rect = self.draw_stats(player, self.backdrop)
+        self.drawn_stats[player] = (stats, rect)
+        if drawn_rect is not None:
+            rect = rect.union(drawn_rect)
+        self.screen.blit(self.backdrop, rect, rect)
+        return rect
+
+    def is_finished(self):
+        if self.max_ticks is not None and self.ticks >= self.max_ticks:
+            return True
+        return self.headless and self.is_match_over()
+
+    def is_match_over(self):
+        return self.get_winner() is not None
+
+    def get_winner(self):
+        """Returns the player left standing, or `None` if both are."""
+        if self.top_player.get_comp(PlayerComp).curr_health <= 0:
+            return self.bottom_player
+        if self.bottom_player.get_comp(PlayerComp).curr_health <= 0:
+            return self.top_player
+        return None
+
+    def get_weber(self):
+        """Returns the Weber class named by `weber`, or a random one."""
+        # Always draw, so that naming the Weber a seed would have picked
+        # anyway (e.g., in a replay) plays the same match.
+        random_weber = self.rng.choice(self.webers)
+        if self.weber is None:
+            return random_weber
+        for weber in self.webers:
+            if weber.NAME == self.weber:
+                return weber
+        raise ValueError(f'Unknown Weber: {self.weber}')
+
+    def choose_bot_move(self, player):
+        moves = player.get_comp(PlayerComp).moves
+        if player is self.top_player and self.top_move is not None:
+            return moves[self.top_move]
+        return self.rng.choice(moves)
+
+    def get_time(self):
+        """Returns the simulated time, in milliseconds."""
+        return self.ticks * 1000 // FPS
+
+    @property
+    def entities(self):
+        """Entity slots, with `None` for free slots."""
+        return self.allocator.entities
 
-            # Send results to screen.
-            pg.display.flip()
+    def create_entity(self):
+        return self.allocator.alloc(self.query_index, self.store)
 
-            # Will make the loop run at the same speed all the time.
-            self.clock.tick(FPS)
-        pg.quit()
+    def spawn(self, archetype, *args):
+        """Returns a new entity set up by `archetype.init(entity, *args)`.
 
-    def create_entity(self):
-        # TODO: Make generational index allocator.
-        result_id = len(self.entities)
-        result = Entity(result_id)
-        self.entities.append(result)
-        return result
+        Archetypes with a `reset` are pooled: their dead entities are reused
+        (see `EntityPool`) rather than built from scratch.
+        """
+        if not hasattr(archetype, 'reset'):
+            entity = self.create_entity()
+            archetype.init(entity, *args)
+            self.snap_entity(entity)
+            return entity
+        pool = self.pools.get(archetype)
+        if pool is None:
+            pool = self.pools[archetype] = EntityPool(self, archetype)
+        return pool.acquire(*args)
+
+    def snap_entity(self, entity):
+        """Draws `entity` where it is now, rather than moving it there over
+        the last tick.  Call after spawning or teleporting it.
+        """
+        if self.store is not None and entity.has_comp(PositionComp):
+            self.store.snap(entity)
+
+    def revive_entity(self, entity):
+        """Brings a destroyed entity back, with the components it had."""
+        self.allocator.revive(entity)
+        entity.index = self.query_index
+        if self.store is not None:
+            entity.store = self.store
+            self.store.reattach(entity)
+        self.query_index.add(entity)
+        if entity.has_comp(DrawComp):
+            entity.get_comp(DrawComp).add(DrawComp.groups)
 
     def destroy_entity(self, entity):
-        assert(entity.ident < len(self.entities))
-        assert(self.entities[entity.ident] is not None)
+        assert(self.allocator.is_alive(entity))
         # TODO: `Game` shouldn't have to worry about killing `DrawComp`s.
         if entity.has_comp(DrawComp):
             entity.get_comp(DrawComp).kill()
-        self.entities[entity.ident] = None
-
-    def draw_stats(self, player):
+        self.query_index.remove(entity)
+        entity.index = None
+        if self.store is not None:
+            self.store.remove(entity)
+            entity.store = None
+        self.allocator.free(entity)
+
+    def is_alive(self, entity):
+        """Returns whether `entity` hasn't been destroyed."""
+        return self.allocator.is_alive(entity)
+
+    def register_query(self, comps):
+        """Registers a component query and returns its key for `get_query`."""
+        return self.query_index.register(comps, self.entities)
+
+    def get_query(self, key):
+        """Returns the live entities matching the query registered as `key`."""
+        return self.query_index.get(key)
+
+    def get_query_slots(self, key):
+        """Returns the slots of the entities matching `key` as an array."""
+        return self.query_index.get_slots(key)
+
+    def draw_stats(self, player, surface):
+        """Draws the stats of `player` to `surface` and returns their rect."""
         PADDING = 5
         pos_bounds = player.get_comp(PositionBoundComp)
         draw_color = Game.FG_COLOR
@@ -203,21 +575,22 @@ class Game:
         else:
             assert False
         player_comp = player.get_comp(PlayerComp)
-        health_rect = self.draw_text(f'HEALTH: {player_comp.curr_health} / {player_comp.max_health}', color=draw_color, **(pos_args[0](None)))
-        power_rect = self.draw_text(f'POWER: {player_comp.curr_power} / {player_comp.max_power}', color=draw_color, **(pos_args[1](health_rect)))
-        self.draw_text(f'DRUNKENNESS: {player_comp.curr_drunkenness} / {player_comp.max_drunkenness}', color=draw_color, **(pos_args[2](power_rect)))
+        health_rect = self.draw_text(surface, f'HEALTH: {player_comp.curr_health} / {player_comp.max_health}', color=draw_color, **(pos_args[0](None)))
+        power_rect = self.draw_text(surface, f'POWER: {player_comp.curr_power} / {player_comp.max_power}', color=draw_color, **(pos_args[1](health_rect)))
+        drunk_rect = self.draw_text(surface, f'DRUNKENNESS: {player_comp.curr_drunkenness} / {player_comp.max_drunkenness}', color=draw_color, **(pos_args[2](power_rect)))
+        return health_rect.unionall([power_rect, drunk_rect])
 
-    def draw_text(self, text, color=GRAY, **kwargs):
-        """Draws `text` to the screen at the location described by `kwargs`.
+    def draw_text(self, surface, text, color=GRAY, **kwargs):
+        """Draws `text` to `surface` at the location described by `kwargs`.
 
         `kwargs` can contain any of the arguments for `Surface.get_rect` (e.g.,
         "topright").
 
         Returns the rectangle for the drawn text.
         """
-        text_surface = self.font.render(text, 1, color)
+        text_surface = render_text(self.font, text, color)
         text_rect = text_surface.get_rect(**kwargs)
-        self.screen.blit(text_surface, text_rect)
+        surface.blit(text_surface, text_rect)
         return text_rect
 
     def get_top_player(self):
@@ -1,55 +1,100 @@
-import numpy as np
-import random
+import functools
 
+import numpy as np
 import pygame as pg
 
-from .component import *
-from .util import DrawRect, make_color_surface
+from .batch import ArrayBatch, BlitLayer
+from .util import make_color_surface
 
 
 class Perlin:
     '''Generate a 2-D Perlin distribution.
 
+    Noise is evaluated for whole grids at once, and summed over several
+    octaves into fractal noise.
+
     More information: https://www.scratchapixel.com/lessons/procedural-generation-virtual-worlds/perlin-noise-part-2
     '''
     SEED_MAX = 15
+    DEFAULT_DENSITY = 4 # px per grid cell
+    DEFAULT_SCALE = 160 # px per noise period of the first octave
+    DEFAULT_OCTAVES = 4
+    GRADIENTS = np.array([[0, 1], [0, -1], [1, 0], [-1, 0]])
 
-    def generate(w, h, n, thresh=0.5):
-        # TODO: Argument documentation.
-        # TODO: Use arguments.
-        lin1 = np.linspace(0, w, n, endpoint=False)
-        lin2 = np.linspace(0, h, n, endpoint=False)
-        x, y = np.meshgrid(lin1, lin2)
-        # lin = np.linspace(0, 5, 100, endpoint=False)
-        # x, y = np.meshgrid(lin, lin)
-        grid = Perlin._perlin(x, y, seed=random.randint(0, Perlin.SEED_MAX))
+    @staticmethod
+    def generate(w, h, seed, density=DEFAULT_DENSITY, scale=DEFAULT_SCALE,
+                 octaves=DEFAULT_OCTAVES, persistence=0.5, lacunarity=2.0):
+        """Returns fractal noise over a `w` x `h` px area, normalized to [0, 1].
+
+        The area is sampled once per `density` x `density` px cell, at the
+        cell centers, and the grid is indexed `[x, y]` like `pg.surfarray`.
+        Each octave is `lacunarity` times finer than the last, and weighted
+        `persistence` times as much.
+        """
+        cols = -(-w // density)
+        rows = -(-h // density)
+        x = (np.arange(cols) + 0.5) * (density / scale)
+        y = (np.arange(rows) + 0.5) * (density / scale)
+        x, y = np.meshgrid(x, y, indexing='ij')
+        grid = Perlin.fractal(x, y, seed, octaves, persistence, lacunarity)
+        lo, hi = grid.min(), grid.max()
+        if hi > lo:
+            grid = (grid - lo) / (hi - lo)
         return grid
 
+    @staticmethod
+    def mask(w, h, seed, thresh=0.5, **kwargs):
+        """Returns the cells of `generate(w, h, seed, ...)` above `thresh`."""
+        return Perlin.generate(w, h, seed, **kwargs) > thresh
+
+    @staticmethod
+    def fractal(x, y, seed=0, octaves=DEFAULT_OCTAVES, persistence=0.5,
+                lacunarity=2.0):
+        """Sums `octaves` octaves of noise at the points `(x, y)`."""
+        total = np.zeros(np.shape(x))
+        frequency, amplitude = 1.0, 1.0
+        for octave in range(octaves):
+            # Offset each octave so their lattices don't line up at the origin.
+            total += amplitude * Perlin._perlin(x * frequency + octave * 17.31,
+                                                y * frequency + octave * 31.17,
+                                                seed)
+            frequency *= lacunarity
+            amplitude *= persistence
+        return total
+
+    @staticmethod
+    @functools.lru_cache(maxsize=SEED_MAX + 1)
+    def permutation(seed):
+        """Returns the (read-only) doubled permutation table for `seed`."""
+        p = np.random.default_rng(seed).permutation(256)
+        p = np.concatenate([p, p])
+        p.flags.writeable = False
+        return p
+
     @staticmethod
     def _perlin(x, y, seed=0):
-        # Permutation Table
-        np.random.seed(seed)
-        p = np.arange(256, dtype=int)
-        np.random.shuffle(p)
-        p = np.stack([p, p]).flatten()
+        p = Perlin.permutation(seed)
         # Coordinates of the Top-left
-        xi = x.astype(int)
-        yi = y.astype(int)
+        xi = np.floor(x).astype(int)
+        yi = np.floor(y).astype(int)
         # Internal Coordinates
         xf = x - xi
         yf = y - yi
+        # The lattice repeats every 256 cells.
+        xi &= 255
+        yi &= 255
         # Fade Factors
         u = Perlin._fade(xf)
         v = Perlin._fade(yf)
         # Noise Components
         n00 = Perlin._gradient(p[p[xi] + yi], xf, yf)
         n01 = Perlin._gradient(p[p[xi] + yi + 1], xf, yf - 1)
-        n11 = Perlin._gradient(p[p[xi + 1] + yi + 1], xf -1, yf-1)
+        n11 = Perlin._gradient(p[p[xi + 1] + yi + 1], xf - 1, yf - 1)
         n10 = Perlin._gradient(p[p[xi + 1] + yi], xf - 1, yf)
         # Combine noises.
         x1 = Perlin._lerp(n00, n10, u)
         x2 = Perlin._lerp(n01, n11, u)
-        return Perlin._lerp(x1,x2,v)
+        return Perlin._lerp(x1, x2, v)
 
     @staticmethod
     def _lerp(a, b, x):
@@ -59,54 +104,142 @@ class Perlin:
     @staticmethod
     def _fade(t):
         """Performs 6t^5 - 15t^4 + 10t^3"""
-        return 6 * t**5 - 15 * t**4 + 10 * t**3
+        return t * t * t * (t * (t * 6 - 15) + 10)
 
     @staticmethod
     def _gradient(h, x, y):
         """Grad converts `h` to the right gradient vector and return the dot product with `(x,y)`."""
-        vectors = np.array([[0, 1], [0, -1], [1, 0], [-1, 0]])
-        g = vectors[h % 4]
-        return g[:, :, 0] * x + g[:, :, 1] * y
+        g = Perlin.GRADIENTS[h & 3]
+        return g[..., 0] * x + g[..., 1] * y
+
+
+class SnowGlobe(ArrayBatch, BlitLayer):
+    """Snowfall, kept in NumPy arrays rather than as entities.
 
+    Falling flakes are moved in bulk and drawn with `Surface.blits`.  Once a
+    flake reaches its target height it settles, and is baked into the
+    persistent `ground` layer (and whatever layers it's drawn over).
 
-class SnowGlobe:
+    The ground starts out with a patchy cover generated from Perlin noise.
+    Flakes are emitted at `rate` flakes per second of simulated time, plus any
+    `burst`s, and never more than `max_live` fall at once.
+    """
     COLORS = [(255,) * 3, (220,) * 3]
     DIMEN  = (8,) * 2
-    OOB_PADDING = 50 # px
-
-    def __init__(self, w, h, create_entitiy, debug_mode=False):
+    FALL_SPEED = 1.0 # px per tick
+    INITIAL_CAPACITY = 256
+    DEFAULT_RATE = 0.3 # flakes per second
+    DEFAULT_MAX_LIVE = 20000
+    TERRAIN_THRESH = 0.6
+    ARRAYS = ('pos', 'vel', 'target_y', 'color_idx')
+
+    def __init__(self, w, h, rng, rate=DEFAULT_RATE,
+                 max_live=DEFAULT_MAX_LIVE, debug_mode=False, headless=False):
         self.w = w
         self.h = h
-        self.create_entitiy = create_entitiy
-        # Generate initial snow from Perlin distribution.
-        # TODO: Generate absolute True/False grid with correct screen dimensions and pixel density.
-        # TODO: Generate snow from grid.
-        if debug_mode:
-            return
-        grid = Perlin.generate(20, 40, 50)
+        self.rng = rng
+        self.rate = rate
+        self.max_live = max_live
+        # Fractional flakes owed by the emitter so far.
+        self.accumulator = 0.0
+        self.pending_burst = 0
+        # Falling flakes.  Only the first `count` rows are live.
+        self.count = 0
+        self.pos = np.zeros((SnowGlobe.INITIAL_CAPACITY, 2))
+        self.vel = np.zeros((SnowGlobe.INITIAL_CAPACITY, 2))
+        self.target_y = np.zeros(SnowGlobe.INITIAL_CAPACITY)
+        self.color_idx = np.zeros(SnowGlobe.INITIAL_CAPACITY, dtype=int)
+        # Flakes that settled since they were last drawn, as (x, y, color).
+        self.settled = []
+        # Where flakes were last drawn, to be cleared.
+        self.drawn_rects = []
+        self.flake_surfaces = [make_color_surface(SnowGlobe.DIMEN, color)
+                               for color in SnowGlobe.COLORS]
+        # Settled snow, starting from a Perlin snowscape.  Headless games never
+        # draw it, so don't bother generating one for them.
+        if debug_mode or headless:
+            self.ground = pg.Surface((w, h), pg.SRCALPHA)
+        else:
+            seed = int(self.rng.integers(Perlin.SEED_MAX + 1))
+            self.ground = SnowGlobe.terrain(w, h, seed).copy()
 
     @staticmethod
-    def create_snowflake():
-        return make_color_surface(SnowGlobe.DIMEN, random.choice(SnowGlobe.COLORS))
-
-    def shake(self):
-        """Spawn snow entities."""
-        t = pg.time.get_ticks()
-
-        if t % 100 != 0:
+    @functools.lru_cache(maxsize=Perlin.SEED_MAX + 1)
+    def terrain(w, h, seed, thresh=TERRAIN_THRESH,
+                density=Perlin.DEFAULT_DENSITY):
+        """Returns the initial snow cover for a `w` x `h` screen.
+
+        Cached for every seed, so matches on the same screen and seed share
+        it; copy it before drawing to it.
+        """
+        mask = Perlin.mask(w, h, seed, thresh, density=density)
+        cells = pg.Surface(mask.shape, pg.SRCALPHA)
+        pg.surfarray.pixels3d(cells)[...] = SnowGlobe.COLORS[1]
+        pg.surfarray.pixels_alpha(cells)[...] = mask * 255
+        return pg.transform.scale(cells, (w, h))
+
+    def spawn(self, n):
+        """Spawns `n` flakes at the top, each falling to a random height."""
+        if n <= 0:
             return
-
-        x, y = (random.randint(0, self.w + 1), 0)
-        target_x, target_y = (x, random.randint(0, self.h + 1))
-        sprites = [self.create_snowflake()]
-        bounds = DrawRect(-SnowGlobe.OOB_PADDING, -SnowGlobe.OOB_PADDING, \
-                          self.w + SnowGlobe.OOB_PADDING, self.h + SnowGlobe.OOB_PADDING, (0, 0, 0))
-
-        # Create entity with components.
-        entity = self.create_entitiy()
-        entity.add_comp(PositionComp(x, y))
-        entity.add_comp(VelocityComp(0.0, 1.0))
-        entity.add_comp(SizeComp(*SnowGlobe.DIMEN))
-        entity.add_comp(OutOfBoundsComp(bounds))
-        entity.add_comp(SnowTargetComp(target_x, target_y))
-        entity.add_comp(DrawComp(sprites))
+        new = self._reserve(n)
+        self.pos[new, 0] = self.rng.integers(self.w + 2, size=n)
+        self.pos[new, 1] = 0
+        self.vel[new] = (0.0, SnowGlobe.FALL_SPEED)
+        self.target_y[new] = self.rng.integers(self.h + 2, size=n)
+        self.color_idx[new] = self.rng.integers(len(SnowGlobe.COLORS), size=n)
+        self.count += n
+
+    def set_rate(self, rate):
+        """Sets the emission rate, in flakes per second."""
+        self.rate = rate
+
+    def burst(self, n):
+        """Emits `n` extra flakes on the next update."""
+        self.pending_burst += n
+
+    def update(self, dt):
+        """Advances the snow by one tick of `dt` seconds.
+
+        Emits the flakes due over `dt`, moves every falling flake, and settles
+        those that have landed.
+        """
+        self.accumulator += self.rate * dt
+        n = int(self.accumulator)
+        self.accumulator -= n
+        n += self.pending_burst
+        self.pending_burst = 0
+        self.spawn(min(n, self.max_live - self.count))
+
+        live = slice(0, self.count)
+        pos, target_y = self.pos[live], self.target_y[live]
+        pos += self.vel[live]
+        landed = pos[:, 1] >= target_y
+        if not landed.any():
+            return
+        pos[landed, 1] = target_y[landed]
+        self.settled.extend(zip(pos[landed, 0].tolist(),
+                                pos[landed, 1].tolist(),
+                                self.color_idx[live][landed].tolist()))
+        self._compact(~landed)
+
+    def draw(self, screen, layers=()):
+        """Draws the falling flakes to `screen`.
+
+        Newly settled flakes are also baked into `ground` and each of the
+        surfaces in `layers`.  Returns the rects drawn.
+        """
+        rects = []
+        if self.settled:
+            settled = [(self.flake_surfaces[color], (x, y))
+                       for x, y, color in self.settled]
+            for layer in [self.ground, *layers]:
+                layer.blits(settled, doreturn=False)
+            rects += screen.blits(settled)
+            self.settled = []
+        live = slice(0, self.count)
+        flakes = list(zip([self.flake_surfaces[color]
+                           for color in self.color_idx[live].tolist()],
+                          self.pos[live].tolist()))
+        self.drawn_rects = screen.blits(flakes)
+        return rects + self.drawn_rects
@@ -1,13 +1,111 @@
+from collections.abc import Sequence
+import threading
+
 import pygame as pg
 
+from .atlas import CACHE_DIR, SpriteAtlas, sprite_paths
+
+
+class AssetManager:
+    """Loads and scales images on first use, and caches them by (path, scale).
+
+    Sprites come from a `SpriteAtlas` per scale factor, built (or loaded from
+    `atlas_dir`) the first time that scale is asked for.  Other images are
+    loaded one by one.  Thread-safe, so that assets can be preloaded in the
+    background.
+    """
+
+    def __init__(self, atlas_dir=CACHE_DIR):
+        self.atlas_dir = atlas_dir
+        self._cache = {}
+        # Scale factor -> atlas of every sprite at that scale.
+        self._atlases = {}
+        self._lock = threading.Lock()
+
+    def get(self, img_loc, scale_factor=None):
+        """Returns the image at `img_loc`, scaled by `scale_factor`."""
+        key = (img_loc, scale_factor)
+        with self._lock:
+            image = self._cache.get(key)
+            if image is None:
+                atlas = self._get_atlas(scale_factor)
+                if img_loc in atlas:
+                    image = atlas.get(img_loc)
+                    self._cache[key] = image
+                    return image
+                image = pg.image.load(img_loc)
+                if scale_factor:
+                    image = pg.transform.scale(
+                                image,
+                                (image.get_width() * scale_factor,
+                                 image.get_height() * scale_factor))
+                self._cache[key] = image
+            return image
+
+    def preload(self, *image_lists, background=True):
+        """Loads every `LazyImages` in `image_lists`.
+
+        With `background`, loads them on a daemon thread and returns it.
+        """
+        def load_all():
+            for images in image_lists:
+                images.load()
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, daemon=True)
+        thread.start()
+        return thread
+
+    def preload_character(self, character, background=True):
+        """Preloads the sprites of a character class and of its projectiles."""
+        image_lists = [character.SPRITES, character.MUG_SPRITES]
+        image_lists += [projectile.SPRITES
+                        for projectile in character.PROJECTILES]
+        return self.preload(*image_lists, background=background)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._atlases.clear()
+
+    def _get_atlas(self, scale_factor):
+        atlas = self._atlases.get(scale_factor)
+        if atlas is None:
+            atlas = SpriteAtlas.build(sprite_paths(), scale_factor,
+                                      self.atlas_dir)
+            self._atlases[scale_factor] = atlas
+        return atlas
+
+
+ASSETS = AssetManager()
+
+
+class LazyImages(Sequence):
+    """List of same-sized images that are only loaded once they're used."""
+
+    def __init__(self, img_locs, scale_factor=None, assets=ASSETS):
+        self.img_locs = list(img_locs)
+        self.scale_factor = scale_factor
+        self.assets = assets
+        self._images = None
+
+    def load(self):
+        if self._images is None:
+            images = [self.assets.get(img_loc, self.scale_factor)
+                      for img_loc in self.img_locs]
+            # Assert all images have the same dimensions.
+            assert(all(map(lambda i: i.get_size() == images[0].get_size(), images)))
+            self._images = images
+        return self._images
+
+    def __getitem__(self, idx):
+        return self.load()[idx]
+
+    def __len__(self):
+        return len(self.img_locs)
+
 
 def load_images(img_locs, scale_factor=None):
-    """Loads and scales the images found in `img_locs`."""
-    images = [pg.image.load(img_loc) for img_loc in img_locs]
-    if scale_factor:
-        images = [pg.transform.scale(img, (img.get_width() * scale_factor,
-                                           img.get_height() * scale_factor))
-                  for img in images]
-    # Assert all images have the same dimensions.
-    assert(all(map(lambda i: i.get_width() == images[0].get_width() and i.get_height() == images[0].get_height(), images)))
-    return images
+    """Returns the images found in `img_locs`, scaled on first use."""
+    return LazyImages(img_locs, scale_factor)
@@ -14,6 +14,16 @@ class InputIntent(Enum):
     CHOOSE_MOVE_TWO = 6
     CHOOSE_MOVE_THREE = 7
 
+    @property
+    def bit(self):
+        """The bit of this intent in a player's intent bitset."""
+        return 1 << self.value
+
+
+# Indices of the players in the input handler.
+TOP_PLAYER_SLOT = 0
+BOTTOM_PLAYER_SLOT = 1
+
 
 CHOICE_INTENTS = [
     InputIntent.CHOOSE_MOVE_ONE,
@@ -46,32 +56,118 @@ BOTTOM_PLAYER_INPUT_CONFIG = {
 }
 
 
+# Slot -> that player's key map.
+KEY_MAPS = [TOP_PLAYER_INPUT_CONFIG, BOTTOM_PLAYER_INPUT_CONFIG]
+
+
 class InputHandler:
-    def __init__(self):
-        self.pressed_keys = {}
-        self.last_pressed_keys = {}
+    """Turns key events into a bitset of `InputIntent`s per player slot.
+
+    Every update, each slot's `held` bitset holds the intents whose keys were
+    down at any point since the last update, so even a tap between two
+    updates registers.  `pressed` and `released` are its edges since the
+    previous update.
+
+    The held bitsets of every update can be recorded, one byte per slot, and
+    played back in place of the keyboard (e.g., in headless games).
+    """
+
+    def __init__(self, key_maps=KEY_MAPS, poll_events=True):
+        # Key -> [(slot, intent bit)]
+        self.bindings = {}
+        for slot, key_map in enumerate(key_maps):
+            for intent, key in key_map.items():
+                self.bindings.setdefault(key, []).append((slot, intent.bit))
+        self.num_slots = len(key_maps)
+        self.poll_events = poll_events
+        # Intents whose keys are down right now.
+        self.down = [0] * self.num_slots
+        self.held = [0] * self.num_slots
+        self.pressed = [0] * self.num_slots
+        self.released = [0] * self.num_slots
+        # Intents pressed since the last update, even if released again.
+        self.taps = [0] * self.num_slots
         self.close_requested = False
+        self.recording = None
+        self.playback = None
+        self.playback_pos = 0
 
     def update(self):
-        self.last_pressed_keys = self.pressed_keys.copy()
-        # Poll the event queue.
-        for event in pg.event.get():
-            if event.type == KEYDOWN:
-                self.pressed_keys[event.key] = True
-            elif event.type == KEYUP:
-                self.pressed_keys[event.key] = False
-            # Check if they tryna leave.
-            self.close_requested |= event.type == QUIT
-            self.close_requested |= self.is_key_down(K_ESCAPE)
-            if self.close_requested:
-                return
+        """Reads the input for the next tick."""
+        if self.poll_events:
+            self._poll()
+        playing = self.playback is not None
+        pos = self.playback_pos
+        for slot in range(self.num_slots):
+            if playing:
+                # Past the end of the playback, nothing is held.
+                held = (self.playback[pos + slot]
+                        if pos + slot < len(self.playback) else 0)
+            else:
+                held = self.down[slot] | self.taps[slot]
+            self.taps[slot] = 0
+            self._set_held(slot, held)
+        if playing:
+            self.playback_pos = pos + self.num_slots
+        if self.recording is not None:
+            self.recording.extend(self.held)
+
+    def is_down(self, slot, intent):
+        return bool(self.held[slot] & intent.bit)
 
-    def is_key_pressed(self, key):
-        return (self.pressed_keys.get(key, False) and
-                not self.last_pressed_keys.get(key, False))
+    def is_pressed(self, slot, intent):
+        return bool(self.pressed[slot] & intent.bit)
 
-    def is_key_down(self, key):
-        return self.pressed_keys.get(key, False)
+    def is_released(self, slot, intent):
+        return bool(self.released[slot] & intent.bit)
+
+    def get_held(self, slot):
+        return self.held[slot]
 
     def is_close_requested(self):
         return self.close_requested
+
+    def start_recording(self):
+        """Starts recording, and returns the `bytearray` recorded into.
+
+        Each update appends one byte per slot.
+        """
+        self.recording = bytearray()
+        return self.recording
+
+    def stop_recording(self):
+        recording, self.recording = self.recording, None
+        return recording
+
+    def play(self, intents):
+        """Reads input from `intents`, as recorded, instead of the keyboard.
+
+        Once `intents` run out, nothing is held anymore.  Events are still
+        polled (if `poll_events`), so that the game can be closed.
+        """
+        self.playback = intents
+        self.playback_pos = 0
+
+    def is_playing(self):
+        return (self.playback is not None and
+                self.playback_pos < len(self.playback))
+
+    def _poll(self):
+        taps = self.taps
+        for event in pg.event.get():
+            if event.type == KEYDOWN:
+                for slot, bit in self.bindings.get(event.key, ()):
+                    self.down[slot] |= bit
+                    taps[slot] |= bit
+                # Check if they tryna leave.
+                self.close_requested |= event.key == K_ESCAPE
+            elif event.type == KEYUP:
+                for slot, bit in self.bindings.get(event.key, ()):
+                    self.down[slot] &= ~bit
+            self.close_requested |= event.type == QUIT
+
+    def _set_held(self, slot, held):
+        last_held = self.held[slot]
+        self.held[slot] = held
+        self.pressed[slot] = held & ~last_held
+        self.released[slot] = last_held & ~held
@@ -7,6 +7,11 @@ class Item:
     def init():
         pass
 
+    @staticmethod
+    def reset(entity, pos):
+        entity_pos = entity.get_comp(PositionComp)
+        entity_pos.x, entity_pos.y = pos
+
 
 class OrnamentItem(Item):
     SPRITES = load_images(['res/img/ornament_1.png'], scale_factor=4)
@@ -21,6 +26,10 @@ class OrnamentItem(Item):
         entity.add_comp(LifetimeComp(OrnamentItem.LIFETIME))
         entity.add_comp(CollideFlag())
 
+    @staticmethod
+    def reset(entity, pos):
+        Item.reset(entity, pos)
+
 
 class BeerItem(Item):
     SPRITES = load_images(['res/img/beer.png'], scale_factor=4)
@@ -33,4 +42,8 @@ class BeerItem(Item):
         entity.add_comp(SizeComp(BeerItem.SPRITES[0].get_width(),
                                  BeerItem.SPRITES[0].get_height()))
         entity.add_comp(LifetimeComp(BeerItem.LIFETIME))
-        entity.add_comp(CollideFlag())
\ No newline at end of file
+        entity.add_comp(CollideFlag())
+
+    @staticmethod
+    def reset(entity, pos):
+        Item.reset(entity, pos)
\ No newline at end of file
@@ -8,7 +8,7 @@ from .component import *
 from .dialog import DialogFrame
 from .entity import Entity
 from .image import load_images
-from .input_handler import TOP_PLAYER_INPUT_CONFIG
+from .input_handler import TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT
 from .player import Player, MoveOption
 from .projectile import BodhisattvaProjectile, RoadToRuinProjectile, \
                         IDontKnowWhatDoYouWannaDoProjectile
@@ -55,6 +55,8 @@ class Janicolous:
                    'confusion.',
                    _init_idkwdywd_move),
     ]
+    PROJECTILES = [BodhisattvaProjectile, RoadToRuinProjectile,
+                   IDontKnowWhatDoYouWannaDoProjectile]
 
     @staticmethod
     def init(entity, x, y, pos_bounds):
@@ -62,5 +64,5 @@ class Janicolous:
                     Janicolous.NAME, Janicolous.QUOTES, Janicolous.MOVES,
                     Janicolous.MUG_SPRITES)
         entity.add_comp(TopPlayerComp())
-        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG))
+        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT))
         entity.add_comp(JanicolousFlag())
\ No newline at end of file
@@ -8,7 +8,7 @@ from .component import *
 from .dialog import DialogFrame
 from .entity import Entity
 from .image import load_images
-from .input_handler import TOP_PLAYER_INPUT_CONFIG
+from .input_handler import TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT
 from .player import Player, MoveOption
 from .projectile import FiveGProjectile, LiteratureProjectile, SemenProjectile
 
@@ -46,6 +46,7 @@ class Joshua:
         MoveOption('LITERATURE', 'A package of knowledge. But this time, it be deadly.', _init_literature_move),
         MoveOption('SEMEN', 'This guy fucks.', _init_semen_move),
     ]
+    PROJECTILES = [FiveGProjectile, LiteratureProjectile, SemenProjectile]
 
     @staticmethod
     def init(entity, x, y, pos_bounds):
@@ -53,5 +54,5 @@ class Joshua:
                     Joshua.NAME, Joshua.QUOTES, Joshua.MOVES,
                     Joshua.MUG_SPRITES)
         entity.add_comp(TopPlayerComp())
-        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG))
+        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT))
         entity.add_comp(JoshuaFlag())
\ No newline at end of file
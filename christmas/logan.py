@@ -8,7 +8,7 @@ from .component import *
 from .dialog import DialogFrame
 from .entity import Entity
 from .image import load_images
-from .input_handler import TOP_PLAYER_INPUT_CONFIG
+from .input_handler import TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT
 from .player import Player, MoveOption
 from .projectile import BreakdanceTornadoProjectile, SilentNightProjectile, GrayEyebrowProjectile
 
@@ -47,6 +47,8 @@ class Logan:
         MoveOption('SILENT NIGHT', 'Throws a void of silent treatment.', _init_silent_night_move),
         MoveOption('THE GRAY', 'That weird eyebrow that\'s kinda gray? Yep, comin\' at ya.', _init_gray_eyebrow_move),
     ]
+    PROJECTILES = [BreakdanceTornadoProjectile, SilentNightProjectile,
+                   GrayEyebrowProjectile]
 
     @staticmethod
     def init(entity, x, y, pos_bounds):
@@ -54,5 +56,5 @@ class Logan:
                     Logan.NAME, Logan.QUOTES, Logan.MOVES,
                     Logan.MUG_SPRITES)
         entity.add_comp(TopPlayerComp())
-        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG))
+        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT))
         entity.add_comp(LoganFlag())
\ No newline at end of file
@@ -8,7 +8,7 @@ from .component import *
 from .dialog import DialogFrame
 from .entity import Entity
 from .image import load_images
-from .input_handler import TOP_PLAYER_INPUT_CONFIG
+from .input_handler import TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT
 from .player import Player, MoveOption
 from .projectile import LubeTubeProjectile, ProteinShakeProjectile, RobotProjectile
 
@@ -49,6 +49,7 @@ class Lucas:
         MoveOption('PROTEIN SHAKE', 'A concoction for massive gains.', _init_protein_shake_move),
         MoveOption('ROBOT', 'Little slave robot come after you hard.', _init_robot_move),
     ]
+    PROJECTILES = [LubeTubeProjectile, ProteinShakeProjectile, RobotProjectile]
 
     @staticmethod
     def init(entity, x, y, pos_bounds):
@@ -56,5 +57,5 @@ class Lucas:
                     Lucas.NAME, Lucas.QUOTES, Lucas.MOVES,
                     Lucas.MUG_SPRITES)
         entity.add_comp(TopPlayerComp())
-        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG))
+        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT))
         entity.add_comp(LucasFlag())
\ No newline at end of file
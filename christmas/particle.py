@@ -1,23 +1,143 @@
-from .component import *
+from collections import namedtuple
+
+import numpy as np
+
+from .batch import ArrayBatch, BlitLayer
 from .image import load_images
-from .player import Player
-
-
-class Particle:
-    def init():
-        pass
-
-
-class BubbleParticle(Particle):
-    SPRITES = load_images(['res/img/bubble_1.png',
-                           'res/img/bubble_2.png'], scale_factor=4)
-    LIFETIME = 20
-    DEFAULT_ANIM_DELAY = 5
-    @staticmethod
-    def init(entity, pos):
-        entity.add_comp(PositionComp(*pos))
-        entity.add_comp(DrawComp(BubbleParticle.SPRITES))
-        entity.add_comp(AnimateComp(BubbleParticle.DEFAULT_ANIM_DELAY))
-        entity.add_comp(SizeComp(BubbleParticle.SPRITES[0].get_width(),
-                                 BubbleParticle.SPRITES[0].get_height()))
-        entity.add_comp(LifetimeComp(BubbleParticle.LIFETIME))
\ No newline at end of file
+from .util import make_color_surface
+
+
+# How an effect's particles look and move.  Every source of the effect emits
+# a mean of `rate` particles per tick per unit of its intensity, each
+# scattered `spread` px (std. dev.) around the source, and living
+# `lifetime` ticks.  Particles cycle through `images`, `anim_delay` ticks
+# per image.
+ParticleEffect = namedtuple('ParticleEffect',
+                            ['images', 'lifetime', 'anim_delay', 'rate',
+                             'spread', 'velocity', 'velocity_spread'])
+
+FIRE_COLORS = [(255, 230, 120), (255, 160, 40), (230, 70, 20), (120, 40, 30)]
+SNOW_COLORS = [(255,) * 3]
+SPECK_DIMEN = (4,) * 2
+
+EFFECTS = {
+    # Bubbles floating around whoever's drunk.
+    'drunk': ParticleEffect(load_images(['res/img/bubble_1.png',
+                                         'res/img/bubble_2.png'],
+                                        scale_factor=4),
+                            lifetime=20, anim_delay=5, rate=0.045,
+                            spread=np.sqrt(50), velocity=(0.0, 0.0),
+                            velocity_spread=(0.0, 0.0)),
+    # Embers that rise and cool from yellow to red.
+    'fire': ParticleEffect([make_color_surface(SPECK_DIMEN, color)
+                            for color in FIRE_COLORS],
+                           lifetime=20, anim_delay=5, rate=0.3, spread=6.0,
+                           velocity=(0.0, -1.5), velocity_spread=(0.3, 0.4)),
+    # Flurries that drift down and melt away.
+    'snow': ParticleEffect([make_color_surface(SPECK_DIMEN, color)
+                            for color in SNOW_COLORS],
+                           lifetime=90, anim_delay=90, rate=0.05,
+                           spread=20.0, velocity=(0.0, 1.0),
+                           velocity_spread=(0.3, 0.1)),
+}
+
+
+class ParticleBatch(ArrayBatch):
+    """Every live particle of one effect, kept in NumPy arrays.
+
+    Spawning, moving, aging and culling each take a handful of array
+    operations however many particles there are.
+    """
+    INITIAL_CAPACITY = 64
+    ARRAYS = ('pos', 'vel', 'age')
+
+    def __init__(self, effect):
+        self.effect = effect
+        # Only the first `count` rows are live.
+        self.count = 0
+        self.pos = np.zeros((ParticleBatch.INITIAL_CAPACITY, 2))
+        self.vel = np.zeros((ParticleBatch.INITIAL_CAPACITY, 2))
+        self.age = np.zeros(ParticleBatch.INITIAL_CAPACITY, dtype=int)
+
+    def spawn(self, origins, rng):
+        """Spawns one particle around each of the (x, y) `origins`."""
+        n = len(origins)
+        if n == 0:
+            return
+        new = self._reserve(n)
+        effect = self.effect
+        self.pos[new] = rng.normal(origins, effect.spread)
+        self.vel[new] = rng.normal(effect.velocity, effect.velocity_spread,
+                                   (n, 2))
+        self.age[new] = 0
+        self.count += n
+
+    def update(self):
+        """Moves and ages every particle, and culls those past their life."""
+        live = slice(0, self.count)
+        self.pos[live] += self.vel[live]
+        self.age[live] += 1
+        alive = self.age[live] < self.effect.lifetime
+        if not alive.all():
+            self._compact(alive)
+
+    def blits(self, alpha=1.0):
+        """Returns the (image, position) of every particle, to be blitted.
+
+        Particles are placed `alpha` of the way from their last position.
+        """
+        live = slice(0, self.count)
+        effect = self.effect
+        images = [effect.images[i] for i in range(len(effect.images))]
+        frames = (self.age[live] // effect.anim_delay) % len(images)
+        pos = self.pos[live] - self.vel[live] * (1 - alpha)
+        return list(zip([images[frame] for frame in frames.tolist()],
+                        pos.tolist()))
+
+
+class ParticleField(BlitLayer):
+    """The particles of every effect, updated and drawn in bulk.
+
+    Like the snow, particles are purely cosmetic, so they draw from their own
+    `rng` and aren't entities.  `ParticleSourceComp`s say where and how
+    strongly each effect is emitted.
+    """
+
+    def __init__(self, rng, effects=EFFECTS):
+        self.rng = rng
+        # Effect name -> its particles.
+        self.batches = {name: ParticleBatch(effect)
+                        for name, effect in effects.items()}
+        # Where particles were last drawn, to be cleared.
+        self.drawn_rects = []
+
+    def __len__(self):
+        return sum(batch.count for batch in self.batches.values())
+
+    def emit(self, effect, origins, intensities):
+        """Emits one tick's particles of `effect` from each source.
+
+        `origins` holds the (x, y) of every source and `intensities` their
+        intensity.
+        """
+        batch = self.batches.get(effect)
+        if batch is None:
+            raise ValueError(f'Unknown particle effect: {effect}')
+        counts = self.rng.poisson(batch.effect.rate *
+                                  np.asarray(intensities, dtype=float))
+        if counts.any():
+            batch.spawn(np.repeat(np.asarray(origins, dtype=float), counts,
+                                  axis=0),
+                        self.rng)
+
+    def update(self):
+        for batch in self.batches.values():
+            batch.update()
+
+    def draw(self, screen, alpha=1.0):
+        """Draws every particle to `screen`.  Returns the rects drawn."""
+        particles = []
+        for batch in self.batches.values():
+            particles += batch.blits(alpha)
+        self.drawn_rects = screen.blits(particles)
+        return self.drawn_rects
@@ -0,0 +1,49 @@
+from .component import DeadFlag, DrawComp, LifetimeComp, PoolComp
+
+
+class EntityPool:
+    """Keeps dead entities of one archetype around to be reused.
+
+    An archetype is a class with an `init(entity, *args)` that gives a new
+    entity its components, and a `reset(entity, *args)` that sets those
+    components to what `init` would have, given the same arguments.
+    Lifetimes and sprite frames are reset here, so archetypes only need to
+    reset what their arguments set.
+
+    Released entities keep their components and sprite, and only leave the
+    game's slots, queries and column store until they're acquired again.
+    """
+    DEFAULT_MAX_SIZE = 1024
+
+    def __init__(self, game, archetype, max_size=DEFAULT_MAX_SIZE):
+        self.game = game
+        self.archetype = archetype
+        self.max_size = max_size
+        self.free = []
+
+    def acquire(self, *args):
+        """Returns a live entity of the archetype, reused if possible."""
+        if not self.free:
+            entity = self.game.create_entity()
+            self.archetype.init(entity, *args)
+            entity.add_comp(PoolComp(self))
+            self.game.snap_entity(entity)
+            return entity
+        entity = self.free.pop()
+        self.game.revive_entity(entity)
+        if entity.has_comp(LifetimeComp):
+            entity.get_comp(LifetimeComp).reset()
+        if entity.has_comp(DrawComp):
+            entity.get_comp(DrawComp).reset()
+        self.archetype.reset(entity, *args)
+        # Don't draw it moving in from where it died.
+        self.game.snap_entity(entity)
+        return entity
+
+    def release(self, entity):
+        """Destroys `entity`, keeping it for reuse if there's room."""
+        self.game.destroy_entity(entity)
+        if len(self.free) < self.max_size:
+            # Not in any query or column anymore, so this touches nothing.
+            entity.remove_comp(DeadFlag)
+            self.free.append(entity)
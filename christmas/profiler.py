@@ -0,0 +1,137 @@
+from contextlib import contextmanager, nullcontext
+import csv
+import json
+import time
+
+import numpy as np
+import pygame as pg
+
+
+class Profiler:
+    """Times the stages of each frame, e.g. every system and the render.
+
+    Keeps the last `window` samples of each stage for rolling percentiles
+    and, with `trace`, every frame's timings so they can be dumped when the
+    game ends.  A disabled profiler times nothing.  All times are in ms.
+    """
+    WINDOW = 256 # frames
+    PERCENTILES = (50, 95, 99)
+    # Total time of each frame, from one `end_frame` to the next.
+    FRAME = 'frame'
+    OVERLAY_ALPHA = 192
+    COL_GAP = 12 # px
+
+    def __init__(self, enabled=True, window=WINDOW, trace=False):
+        self.enabled = enabled
+        self.window = window
+        self.trace = [] if trace else None
+        # Stage -> ring buffer of its last `window` samples.
+        self.samples = {}
+        self.counts = {}
+        self.frame = {}
+        self.frame_start = None
+
+    def time(self, stage):
+        """Returns a context manager that adds its duration to `stage`."""
+        if not self.enabled:
+            return nullcontext()
+        return self._time(stage)
+
+    @contextmanager
+    def _time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, (time.perf_counter() - start) * 1000)
+
+    def record(self, stage, ms):
+        """Adds `ms` to this frame's time for `stage`."""
+        self.frame[stage] = self.frame.get(stage, 0.0) + ms
+
+    def end_frame(self):
+        """Files this frame's timings.  Call once per frame."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.frame[Profiler.FRAME] = (now - self.frame_start) * 1000
+        self.frame_start = now
+        for stage, ms in self.frame.items():
+            samples = self.samples.get(stage)
+            if samples is None:
+                samples = self.samples[stage] = np.zeros(self.window)
+                self.counts[stage] = 0
+            samples[self.counts[stage] % self.window] = ms
+            self.counts[stage] += 1
+        if self.trace is not None:
+            self.trace.append(self.frame)
+        self.frame = {}
+
+    def percentiles(self, stage):
+        """Returns the rolling `PERCENTILES` of `stage`."""
+        n = min(self.counts.get(stage, 0), self.window)
+        if n == 0:
+            return (0.0,) * len(Profiler.PERCENTILES)
+        return tuple(np.percentile(self.samples[stage][:n],
+                                   Profiler.PERCENTILES).tolist())
+
+    def mean(self, stage):
+        """Returns the mean of the rolling window of `stage`."""
+        n = min(self.counts.get(stage, 0), self.window)
+        return float(self.samples[stage][:n].mean()) if n else 0.0
+
+    def summary(self):
+        """Returns {stage: {'p50': ..., ...}} for every stage seen so far."""
+        return {stage: dict(zip([f'p{p}' for p in Profiler.PERCENTILES],
+                                self.percentiles(stage)))
+                for stage in self.samples}
+
+    def render(self, font, color, bg_color, alpha=OVERLAY_ALPHA):
+        """Renders the rolling percentiles as a table, to overlay the game."""
+        rows = [['STAGE'] + [f'P{p}' for p in Profiler.PERCENTILES]]
+        for stage in self.samples:
+            # "CollideSystem" -> "COLLIDE"
+            name = stage[:-len('System')] if stage.endswith('System') else stage
+            rows.append([name.upper()] +
+                        [f'{ms:.2f}' for ms in self.percentiles(stage)])
+        texts = [[font.render(cell, False, color) for cell in row]
+                 for row in rows]
+        # The font isn't monospaced, so line up the columns by hand.
+        col_widths = [max(row[col].get_width() for row in texts)
+                      for col in range(len(rows[0]))]
+        line_height = font.get_linesize()
+        surface = pg.Surface((sum(col_widths) + Profiler.COL_GAP *
+                                                (len(col_widths) - 1),
+                              line_height * len(texts)))
+        surface.fill(bg_color)
+        for i, row in enumerate(texts):
+            y = i * line_height
+            surface.blit(row[0], (0, y))
+            right = col_widths[0]
+            # Right-align the numbers.
+            for text, width in zip(row[1:], col_widths[1:]):
+                right += Profiler.COL_GAP + width
+                surface.blit(text, text.get_rect(topright=(right, y)))
+        surface.set_alpha(alpha)
+        return surface
+
+    def dump(self, path):
+        """Writes the trace and summary to `path`, as CSV or JSON.
+
+        CSV (by `.csv` extension) has one row of stage times per frame, while
+        JSON also holds the summary.
+        """
+        frames = self.trace or []
+        if path.endswith('.csv'):
+            stages = list(self.samples)
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                # `stages` already has a 'frame' column for the frame times.
+                writer.writerow(['index'] + stages)
+                for i, frame in enumerate(frames):
+                    writer.writerow([i] + [frame.get(stage, '')
+                                           for stage in stages])
+        else:
+            with open(path, 'w') as f:
+                json.dump({'summary': self.summary(), 'frames': frames}, f)
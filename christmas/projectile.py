@@ -29,6 +29,15 @@ class Projectile:
         entity.add_comp(SizeComp(sprites[0].get_width(),
                                  sprites[0].get_height()))
 
+    @staticmethod
+    def reset(entity, owner, x, y, xv, yv):
+        """Readies a pooled projectile to be fired again."""
+        pos, vel = entity.get_comps(PositionComp, VelocityComp)
+        pos.x, pos.y = x, y
+        vel.x, vel.y = xv, yv
+        if entity.get_comp(OwnerComp).owner is not owner:
+            entity.set_comp(OwnerComp(owner))
+
 
 # TODO: Move bot stuff to its own file.
 class BotProjectile(Projectile):
@@ -49,7 +58,7 @@ class BotProjectile(Projectile):
         entity.add_comp(MemoryComp())
 
 
-class CoalProjectile:
+class CoalProjectile(Projectile):
     SPRITES = load_images([
         'res/img/coal.png',
     ], scale_factor=4)
@@ -62,7 +71,7 @@ class CoalProjectile:
                         CoalProjectile.LIFETIME)
 
 
-class BeerProjectile:
+class BeerProjectile(Projectile):
     SPRITES = load_images([
         'res/img/beer.png',
     ], scale_factor=4)
@@ -90,7 +99,7 @@ class ElfProjectile:
                            ElfProjectile.SPEED)
 
 
-class BallsProjectile:
+class BallsProjectile(Projectile):
     SPRITES = load_images(['res/img/balls.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -100,7 +109,7 @@ class BallsProjectile:
                         BallsProjectile.SPRITES, BallsProjectile.LIFETIME)
 
 
-class FootballProjectile:
+class FootballProjectile(Projectile):
     SPRITES = load_images(['res/img/football.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -111,7 +120,7 @@ class FootballProjectile:
                         FootballProjectile.LIFETIME)
 
 
-class JointProjectile:
+class JointProjectile(Projectile):
     SPRITES = load_images(['res/img/joint.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -122,7 +131,7 @@ class JointProjectile:
                         JointProjectile.LIFETIME)
 
 
-class DumbbellProjectile:
+class DumbbellProjectile(Projectile):
     SPRITES = load_images(['res/img/dumbbell.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -133,7 +142,7 @@ class DumbbellProjectile:
                         DumbbellProjectile.LIFETIME)
 
 
-class FinancialReportProjectile:
+class FinancialReportProjectile(Projectile):
     SPRITES = load_images(['res/img/financial_report.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -144,7 +153,7 @@ class FinancialReportProjectile:
                         FinancialReportProjectile.LIFETIME)
 
 
-class HayBaleProjectile:
+class HayBaleProjectile(Projectile):
     SPRITES = load_images(['res/img/hay.png'], scale_factor=2)
     LIFETIME = 60
 
@@ -154,7 +163,7 @@ class HayBaleProjectile:
                         HayBaleProjectile.SPRITES, HayBaleProjectile.LIFETIME)
 
 
-class RockPileProjectile:
+class RockPileProjectile(Projectile):
     SPRITES = load_images(['res/img/rock_pile.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -165,7 +174,7 @@ class RockPileProjectile:
                         RockPileProjectile.LIFETIME)
 
 
-class GiftOfLifeProjectile:
+class GiftOfLifeProjectile(Projectile):
     SPRITES = load_images(['res/img/gift_of_life.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -176,7 +185,7 @@ class GiftOfLifeProjectile:
                         GiftOfLifeProjectile.LIFETIME)
 
 
-class MrSpoonProjectile:
+class MrSpoonProjectile(Projectile):
     SPRITES = load_images(['res/img/mr_spoon.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -186,7 +195,7 @@ class MrSpoonProjectile:
                         MrSpoonProjectile.SPRITES, MrSpoonProjectile.LIFETIME)
 
 
-class BreakdanceTornadoProjectile:
+class BreakdanceTornadoProjectile(Projectile):
     SPRITES = load_images(['res/img/breakdance_tornado.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -197,7 +206,7 @@ class BreakdanceTornadoProjectile:
                         BreakdanceTornadoProjectile.LIFETIME)
 
 
-class SilentNightProjectile:
+class SilentNightProjectile(Projectile):
     SPRITES = load_images(['res/img/silent_night.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -208,7 +217,7 @@ class SilentNightProjectile:
                         SilentNightProjectile.LIFETIME)
 
 
-class GrayEyebrowProjectile:
+class GrayEyebrowProjectile(Projectile):
     SPRITES = load_images(['res/img/gray_eyebrow.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -219,7 +228,7 @@ class GrayEyebrowProjectile:
                         GrayEyebrowProjectile.LIFETIME)
 
 
-class LubeTubeProjectile:
+class LubeTubeProjectile(Projectile):
     SPRITES = load_images(['res/img/lube.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -230,7 +239,7 @@ class LubeTubeProjectile:
                         LubeTubeProjectile.LIFETIME)
 
 
-class ProteinShakeProjectile:
+class ProteinShakeProjectile(Projectile):
     SPRITES = load_images(['res/img/protein_shake.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -241,7 +250,7 @@ class ProteinShakeProjectile:
                         ProteinShakeProjectile.LIFETIME)
 
 
-class RobotProjectile:
+class RobotProjectile(Projectile):
     SPRITES = load_images(['res/img/robot.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -251,7 +260,7 @@ class RobotProjectile:
                         RobotProjectile.SPRITES, RobotProjectile.LIFETIME)
 
 
-class FiveGProjectile:
+class FiveGProjectile(Projectile):
     SPRITES = load_images(['res/img/5g.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -261,7 +270,7 @@ class FiveGProjectile:
                         FiveGProjectile.SPRITES, FiveGProjectile.LIFETIME)
 
 
-class LiteratureProjectile:
+class LiteratureProjectile(Projectile):
     SPRITES = load_images(['res/img/literature.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -272,7 +281,7 @@ class LiteratureProjectile:
                         LiteratureProjectile.LIFETIME)
 
 
-class SemenProjectile:
+class SemenProjectile(Projectile):
     SPRITES = load_images(['res/img/cum.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -283,7 +292,7 @@ class SemenProjectile:
                         SemenProjectile.LIFETIME)
 
 
-class BodhisattvaProjectile:
+class BodhisattvaProjectile(Projectile):
     SPRITES = load_images(['res/img/bodhi.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -294,7 +303,7 @@ class BodhisattvaProjectile:
                         BodhisattvaProjectile.LIFETIME)
 
 
-class RoadToRuinProjectile:
+class RoadToRuinProjectile(Projectile):
     SPRITES = load_images(['res/img/road_to_ruin.png'], scale_factor=4)
     LIFETIME = 60
 
@@ -305,7 +314,7 @@ class RoadToRuinProjectile:
                         RoadToRuinProjectile.LIFETIME)
 
 
-class IDontKnowWhatDoYouWannaDoProjectile:
+class IDontKnowWhatDoYouWannaDoProjectile(Projectile):
     SPRITES = load_images(['res/img/idkwdywd.png'], scale_factor=4)
     LIFETIME = 60
 
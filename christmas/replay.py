@@ -0,0 +1,89 @@
+import struct
+
+from .component import PlayerComp
+
+
+class Replay:
+    """Everything needed to play a match again: its setup and its input.
+
+    Games are deterministic given their seed, so besides the seed and the
+    settings that shape the match, a replay only holds the intent bitset
+    of every player slot on every tick.  Saved as:
+
+        header   magic, version, flags, top move, width, height, number of
+                 slots and number of ticks (see `HEADER`)
+        seed     length-prefixed unsigned little-endian int
+        weber    length-prefixed UTF-8 name
+        intents  one byte per slot per tick
+    """
+    MAGIC = b'AOWC'
+    # Bump whenever the same seed and input no longer play the same match.
+    VERSION = 2
+    HEADER = struct.Struct('<4sHBbHHBI')
+    BOTS_FLAG = 0x1
+    NO_MOVE = -1
+
+    def __init__(self, seed, weber, intents, num_slots=2, width=700,
+                 height=700, bots=False, top_move=None):
+        self.seed = seed
+        self.weber = weber
+        self.intents = bytes(intents)
+        self.num_slots = num_slots
+        self.width = width
+        self.height = height
+        self.bots = bots
+        self.top_move = top_move
+
+    @property
+    def ticks(self):
+        return len(self.intents) // self.num_slots
+
+    @staticmethod
+    def from_game(game, intents):
+        """Returns the replay of `game`, given the `intents` it recorded."""
+        return Replay(game.rng.seed,
+                      game.get_top_player().get_comp(PlayerComp).name,
+                      intents, game.input_handler.num_slots, game.width,
+                      game.height, game.bots, game.top_move)
+
+    def save(self, path):
+        seed = self.seed.to_bytes((self.seed.bit_length() + 7) // 8 or 1,
+                                  'little')
+        weber = self.weber.encode()
+        flags = Replay.BOTS_FLAG if self.bots else 0
+        top_move = Replay.NO_MOVE if self.top_move is None else self.top_move
+        with open(path, 'wb') as f:
+            f.write(Replay.HEADER.pack(Replay.MAGIC, Replay.VERSION, flags,
+                                       top_move, self.width, self.height,
+                                       self.num_slots, self.ticks))
+            f.write(bytes([len(seed)]) + seed)
+            f.write(bytes([len(weber)]) + weber)
+            f.write(self.intents)
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            (magic, version, flags, top_move, width, height, num_slots,
+             ticks) = Replay.HEADER.unpack_from(data)
+        except struct.error:
+            raise ValueError(f'{path} is too short to be a replay')
+        if magic != Replay.MAGIC:
+            raise ValueError(f'{path} is not a replay')
+        if version != Replay.VERSION:
+            raise ValueError(f'{path} is a version {version} replay, but '
+                             f'only version {Replay.VERSION} is supported')
+        pos = Replay.HEADER.size
+        seed_len = data[pos]
+        seed = int.from_bytes(data[pos + 1:pos + 1 + seed_len], 'little')
+        pos += 1 + seed_len
+        weber_len = data[pos]
+        weber = data[pos + 1:pos + 1 + weber_len].decode()
+        pos += 1 + weber_len
+        intents = data[pos:]
+        if len(intents) != ticks * num_slots:
+            raise ValueError(f'{path} is truncated')
+        return Replay(seed, weber, intents, num_slots, width, height,
+                      bool(flags & Replay.BOTS_FLAG),
+                      None if top_move == Replay.NO_MOVE else top_move)
@@ -0,0 +1,47 @@
+import numpy as np
+
+
+class Rng:
+    """Per-game source of randomness, built on `np.random.Generator`.
+
+    Everything random in a game draws from its `Rng`, so one seed reproduces
+    a whole match.  Cosmetic randomness (snow, sound) should draw from a
+    `spawn`ed child instead, so that it can't shift the simulation's stream.
+    """
+
+    def __init__(self, seed=None):
+        """`seed` is an int, a `SeedSequence`, or `None` for a fresh seed."""
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        self.seed_seq = seed
+        # Root entropy, which reproduces this `Rng` (and its children).
+        self.seed = seed.entropy
+        self.generator = np.random.default_rng(seed)
+
+    def spawn(self):
+        """Returns an independent child `Rng`."""
+        return Rng(self.seed_seq.spawn(1)[0])
+
+    def choice(self, seq):
+        """Returns a uniformly chosen element of the sequence `seq`."""
+        return seq[self.generator.integers(len(seq))]
+
+    def integers(self, low, high=None, size=None):
+        """Returns integers in `[low, high)`, or `[0, low)` without `high`."""
+        return self.generator.integers(low, high, size)
+
+    def random(self, size=None):
+        """Returns floats in `[0, 1)`."""
+        return self.generator.random(size)
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        return self.generator.normal(loc, scale, size)
+
+    def poisson(self, lam=1.0, size=None):
+        return self.generator.poisson(lam, size)
+
+    def multivariate_normal(self, mean, cov, size=None):
+        return self.generator.multivariate_normal(mean, cov, size)
+
+    def permutation(self, x):
+        return self.generator.permutation(x)
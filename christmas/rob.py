@@ -8,7 +8,7 @@ from .component import *
 from .dialog import DialogFrame
 from .entity import Entity
 from .image import load_images
-from .input_handler import TOP_PLAYER_INPUT_CONFIG
+from .input_handler import TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT
 from .player import Player, MoveOption
 from .projectile import DumbbellProjectile, FinancialReportProjectile, HayBaleProjectile
 
@@ -49,6 +49,7 @@ class Robert:
         MoveOption('FINANCIAL REPORT', 'A financial report tailored just for you.', _init_financial_report_move),
         MoveOption('HAY BALE', 'The devil went down to Georgia.', _init_hay_bale_move),
     ]
+    PROJECTILES = [DumbbellProjectile, FinancialReportProjectile, HayBaleProjectile]
 
     @staticmethod
     def init(entity, x, y, pos_bounds):
@@ -56,5 +57,5 @@ class Robert:
                     Robert.NAME, Robert.QUOTES, Robert.MOVES,
                     Robert.MUG_SPRITES)
         entity.add_comp(TopPlayerComp())
-        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG))
+        entity.add_comp(InputConfigComp(TOP_PLAYER_INPUT_CONFIG, TOP_PLAYER_SLOT))
         entity.add_comp(RobertFlag())
\ No newline at end of file
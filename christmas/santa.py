@@ -7,7 +7,7 @@ from .component import *
 from .dialog import DialogFrame
 from .entity import Entity
 from .image import load_images
-from .input_handler import BOTTOM_PLAYER_INPUT_CONFIG
+from .input_handler import BOTTOM_PLAYER_INPUT_CONFIG, BOTTOM_PLAYER_SLOT
 from .player import Player, MoveOption
 from .projectile import CoalProjectile, BeerProjectile, ElfProjectile
 
@@ -55,6 +55,7 @@ class Santa:
         MoveOption('Beer', 'Get fukn turnt, kids', _init_beer_move),
         MoveOption('Elf', 'DAD! DYAAADDDD!!!!', _init_elf_move),
     ]
+    PROJECTILES = [CoalProjectile, BeerProjectile, ElfProjectile]
     STARTING_DRUNKENNESS = 5
 
     @staticmethod
@@ -65,6 +66,7 @@ class Santa:
         entity.add_comp(ParticleSourceComp('drunk',
                                            Santa.STARTING_DRUNKENNESS))
         entity.add_comp(BottomPlayerComp())
-        entity.add_comp(InputConfigComp(BOTTOM_PLAYER_INPUT_CONFIG))
+        entity.add_comp(InputConfigComp(BOTTOM_PLAYER_INPUT_CONFIG,
+                                         BOTTOM_PLAYER_SLOT))
         entity.add_comp(SantaFlag())
         entity.add_comp(AutoComp('manhattan'))
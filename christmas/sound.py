@@ -1,9 +1,8 @@
+from collections import OrderedDict
 from enum import Enum
 import glob
 import pygame as pg
 
-import random
-
 
 class SoundType(Enum):
     SFX_HIT = 1
@@ -18,37 +17,104 @@ class SoundType(Enum):
     MUSIC_FIGHT = 9
 
 
+SOUND_GLOBS = {
+    SoundType.MUSIC_IDLE            : 'res/sound/music/idle/*',
+    SoundType.MUSIC_FIGHT           : 'res/sound/music/fight/*',
+    SoundType.SFX_HIT               : 'res/sound/sfx/hit/*',
+    SoundType.SFX_CRITICAL_HIT      : 'res/sound/sfx/critical-hit/*',
+    SoundType.SFX_BOUNCE            : 'res/sound/sfx/bounce/*',
+    SoundType.SFX_ATTACK            : 'res/sound/sfx/attack/*',
+    SoundType.SFX_SPECIAL_ACQUIRED  : 'res/sound/sfx/special-acquired/*',
+    SoundType.SFX_SPECIAL_SHOT      : 'res/sound/sfx/special-shot/*',
+    SoundType.SFX_COLLECT           : 'res/sound/sfx/collect/*',
+}
+
+MUSIC_TYPES = [SoundType.MUSIC_IDLE, SoundType.MUSIC_FIGHT]
+
+
 class Sound:
-    def __init__(self, debug_mode=False):
-        self._debug_mode = debug_mode
-        if self._debug_mode:
+    """Plays music and sound effects.
+
+    Music is streamed from disk through `pg.mixer.music`, and sound effects
+    are decoded on first play and kept in a small LRU cache, so nothing is
+    loaded up front.
+    """
+    # Max number of decoded sound effects kept in memory
+    SFX_CACHE_SIZE = 16
+
+    def __init__(self, rng, debug_mode=False, muted=False):
+        self._rng = rng
+        self._muted = debug_mode or muted
+        if self._muted:
             return
         # Initialize mixer.
         pg.mixer.init()
-        # Load `Sound` objects into memory.
-        load_sounds = lambda d: [pg.mixer.Sound(f) for f in glob.glob(d)]
-        self._sounds = {
-            SoundType.MUSIC_IDLE            : load_sounds('res/sound/music/idle/*'),
-            SoundType.MUSIC_FIGHT           : load_sounds('res/sound/music/fight/*'),
-            SoundType.SFX_HIT               : load_sounds('res/sound/sfx/hit/*'),
-            SoundType.SFX_CRITICAL_HIT      : load_sounds('res/sound/sfx/critical-hit/*'),
-            SoundType.SFX_BOUNCE            : load_sounds('res/sound/sfx/bounce/*'),
-            SoundType.SFX_ATTACK            : load_sounds('res/sound/sfx/attack/*'),
-            SoundType.SFX_SPECIAL_ACQUIRED  : load_sounds('res/sound/sfx/special-acquired/*'),
-            SoundType.SFX_SPECIAL_SHOT      : load_sounds('res/sound/sfx/special-shot/*'),
-        }
+        # Only list the files for now; they're loaded when played.
+        self._files = {sound_type: sorted(glob.glob(pattern))
+                       for sound_type, pattern in SOUND_GLOBS.items()}
+        self._sfx_cache = OrderedDict()
+        self._music_type = None
+        # Music is silent while paused, so `update` mustn't restart it.
+        self._paused = False
         # Start game with fighting music.
         self.play(SoundType.MUSIC_FIGHT)
 
     def play(self, sound_type):
-        if self._debug_mode:
+        if self._muted:
             return
         assert(isinstance(sound_type, SoundType))
-        # NOTE: There's a pg.mixer.music.queue method for song queues.
-        random.choice(self._sounds[sound_type]).play()
+        files = self._files[sound_type]
+        if not files:
+            return
+        if sound_type in MUSIC_TYPES:
+            self._music_type = sound_type
+            pg.mixer.music.load(self._rng.choice(files))
+            pg.mixer.music.play()
+            self._queue_music()
+        else:
+            self._get_sfx(self._rng.choice(files)).play()
+
+    def update(self):
+        """Keeps the current music going.  Call once per frame."""
+        if self._muted or self._paused or self._music_type is None:
+            return
+        # The queue only holds one track, so once it has started playing and
+        # finished too, start over with a fresh pair.
+        if not pg.mixer.music.get_busy():
+            self.play(self._music_type)
+
+    def pause(self):
+        if self._muted:
+            return
+        self._paused = True
+        pg.mixer.pause()
+        pg.mixer.music.pause()
+
+    def unpause(self):
+        if self._muted:
+            return
+        self._paused = False
+        pg.mixer.unpause()
+        pg.mixer.music.unpause()
+
+    def stop(self):
+        if self._muted:
+            return
+        self._music_type = None
+        self._paused = False
+        pg.mixer.stop()
+        pg.mixer.music.stop()
 
-    def pause():
-        raise NotImplementedError
+    def _queue_music(self):
+        pg.mixer.music.queue(self._rng.choice(self._files[self._music_type]))
 
-    def stop():
-        raise NotImplementedError
+    def _get_sfx(self, path):
+        sfx = self._sfx_cache.get(path)
+        if sfx is None:
+            sfx = pg.mixer.Sound(path)
+            self._sfx_cache[path] = sfx
+            if len(self._sfx_cache) > Sound.SFX_CACHE_SIZE:
+                self._sfx_cache.popitem(last=False)
+        else:
+            self._sfx_cache.move_to_end(path)
+        return sfx
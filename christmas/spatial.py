@@ -0,0 +1,70 @@
+import math
+
+import numpy as np
+
+
+class SpatialHash:
+    """Uniform grid that bins axis-aligned boxes by the cells they overlap.
+
+    Used as a collision broad phase: insert the boxes of one group, then query
+    with the boxes of another to get only the nearby candidates.
+    """
+    DEFAULT_CELL_SIZE = 64 # px
+
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        # (cell x, cell y) -> items whose box overlaps that cell.
+        self.cells = {}
+
+    def clear(self):
+        self.cells.clear()
+
+    def insert(self, item, x, y, w, h):
+        for cell in self._cells_for(x, y, w, h):
+            self.cells.setdefault(cell, []).append(item)
+
+    def query(self, x, y, w, h):
+        """Returns the items in any cell overlapped by the given box."""
+        result = []
+        seen = set()
+        for cell in self._cells_for(x, y, w, h):
+            for item in self.cells.get(cell, ()):
+                if id(item) not in seen:
+                    seen.add(id(item))
+                    result.append(item)
+        return result
+
+    def _cells_for(self, x, y, w, h):
+        size = self.cell_size
+        x0, x1 = math.floor(x / size), math.floor((x + w) / size)
+        y0, y1 = math.floor(y / size), math.floor((y + h) / size)
+        return ((cx, cy) for cx in range(x0, x1 + 1)
+                         for cy in range(y0, y1 + 1))
+
+
+def aabb_overlap_pairs(boxes1, boxes2):
+    """Returns every overlapping pair between two arrays of boxes.
+
+    `boxes1` and `boxes2` are `(n, 4)` and `(m, 4)` arrays of (x, y, w, h)
+    rows.  Returns index arrays `(i, j)` such that `boxes1[i[k]]` overlaps
+    `boxes2[j[k]]`, ordered by `i`.
+    """
+    a = boxes1[:, None, :]
+    b = boxes2[None, :, :]
+    hits = ((a[..., 0] < b[..., 0] + b[..., 2]) &
+            (a[..., 0] + a[..., 2] > b[..., 0]) &
+            (a[..., 1] < b[..., 1] + b[..., 3]) &
+            (a[..., 1] + a[..., 3] > b[..., 1]))
+    return np.nonzero(hits)
+
+
+def aabb_overlaps(boxes1, boxes2):
+    """Tests `boxes1[k]` against `boxes2[k]` for every row `k`.
+
+    Returns a boolean array, for narrow-phase testing of the candidate pairs
+    produced by a broad phase.
+    """
+    return ((boxes1[:, 0] < boxes2[:, 0] + boxes2[:, 2]) &
+            (boxes1[:, 0] + boxes1[:, 2] > boxes2[:, 0]) &
+            (boxes1[:, 1] < boxes2[:, 1] + boxes2[:, 3]) &
+            (boxes1[:, 1] + boxes1[:, 3] > boxes2[:, 1]))
@@ -0,0 +1,24 @@
+from collections import Counter
+
+from .component import MoveComp, OwnerComp, PlayerComp
+
+
+class MatchStats:
+    """Tallies what happened during a match, for balance testing."""
+
+    def __init__(self):
+        # Player name -> projectiles fired.
+        self.projectiles_fired = Counter()
+        # (player name, move prompt) -> damage dealt by that move.
+        self.damage_by_move = Counter()
+
+    def record_fire(self, shooter, projectile):
+        self.projectiles_fired[shooter.get_comp(PlayerComp).name] += 1
+
+    def record_damage(self, projectile, victim, damage):
+        if not projectile.has_comp(OwnerComp):
+            return
+        owner = projectile.get_comp(OwnerComp).owner
+        move = projectile.get_comp(MoveComp).name \
+               if projectile.has_comp(MoveComp) else None
+        self.damage_by_move[(owner.get_comp(PlayerComp).name, move)] += damage
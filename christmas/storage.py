@@ -0,0 +1,163 @@
+import numpy as np
+
+from .component import PositionComp, VelocityComp
+
+
+class PositionView(PositionComp):
+    """`PositionComp` whose data lives in a row of a `ColumnStore` column."""
+    COMP_TYPE = PositionComp
+
+    def __init__(self, row):
+        self.row = row
+
+    @property
+    def x(self):
+        return float(self.row[0])
+
+    @x.setter
+    def x(self, value):
+        self.row[0] = value
+
+    @property
+    def y(self):
+        return float(self.row[1])
+
+    @y.setter
+    def y(self, value):
+        self.row[1] = value
+
+
+class VelocityView(VelocityComp):
+    """`VelocityComp` whose data lives in a row of a `ColumnStore` column."""
+    COMP_TYPE = VelocityComp
+
+    def __init__(self, row):
+        self.row = row
+
+    @property
+    def x(self):
+        return float(self.row[0])
+
+    @x.setter
+    def x(self, value):
+        self.row[0] = value
+
+    @property
+    def y(self):
+        return float(self.row[1])
+
+    @y.setter
+    def y(self, value):
+        self.row[1] = value
+
+
+class ColumnStore:
+    """Struct-of-arrays storage for the hot (x, y) components.
+
+    Each stored component type gets an `(capacity, 2)` array indexed by entity
+    slot.  Entities hand their components over through `attach`, and keep a
+    lightweight view of their row in place of the original object, so
+    `get_comp` callers don't know the difference while systems can update
+    whole columns at once.
+
+    Positions as of the start of the last tick are kept too, for rendering
+    in between ticks.
+    """
+    VIEWS = {
+        PositionComp: PositionView,
+        VelocityComp: VelocityView,
+    }
+    INITIAL_CAPACITY = 256
+
+    def __init__(self):
+        self.capacity = ColumnStore.INITIAL_CAPACITY
+        self.columns = {comp_type: np.zeros((self.capacity, 2))
+                        for comp_type in ColumnStore.VIEWS}
+        # Component type -> slot -> attached view.
+        self.views = {comp_type: {} for comp_type in ColumnStore.VIEWS}
+        self.prev_positions = np.zeros((self.capacity, 2))
+
+    def is_stored(self, comp_type):
+        return comp_type in self.views
+
+    def attach(self, entity, comp):
+        """Moves `comp`'s data into its column and returns the view to keep."""
+        comp_type = type(comp)
+        slot = entity.ident
+        if slot >= self.capacity:
+            self._grow(slot + 1)
+        column = self.columns[comp_type]
+        column[slot] = (comp.x, comp.y)
+        if comp_type is PositionComp:
+            # Don't interpolate from wherever the slot's last entity was.
+            self.prev_positions[slot] = column[slot]
+        view = ColumnStore.VIEWS[comp_type](column[slot])
+        self.views[comp_type][slot] = view
+        return view
+
+    def reattach(self, entity):
+        """Moves the data of the views `entity` kept through `detach` back
+        into their columns, at the entity's (new) slot.
+        """
+        slot = entity.ident
+        if slot >= self.capacity:
+            self._grow(slot + 1)
+        for comp_type, column in self.columns.items():
+            if not entity.has_comp(comp_type):
+                continue
+            view = entity.get_comp(comp_type)
+            column[slot] = view.row
+            view.row = column[slot]
+            self.views[comp_type][slot] = view
+            if comp_type is PositionComp:
+                self.prev_positions[slot] = column[slot]
+
+    def detach(self, entity, comp_type):
+        """Gives the view for `comp_type` its own copy of its data.
+
+        Keeps stray references to the view working after the slot is reused.
+        """
+        view = self.views[comp_type].pop(entity.ident)
+        view.row = view.row.copy()
+
+    def remove(self, entity):
+        """Detaches every stored component of `entity`."""
+        for comp_type in self.views:
+            if entity.has_comp(comp_type):
+                self.detach(entity, comp_type)
+
+    def column(self, comp_type):
+        return self.columns[comp_type]
+
+    def save_positions(self):
+        """Remembers the current positions, before a tick moves them."""
+        self.prev_positions[:] = self.columns[PositionComp]
+
+    def snap(self, entity):
+        """Has `entity` start the last tick where it is now, so that it's
+        drawn there rather than moving in from where it was.
+        """
+        slot = entity.ident
+        self.prev_positions[slot] = self.columns[PositionComp][slot]
+
+    def interpolate_positions(self, slots, alpha):
+        """Returns the positions of `slots`, `alpha` of the way through the
+        last tick.
+        """
+        prev = self.prev_positions[slots]
+        return prev + alpha * (self.columns[PositionComp][slots] - prev)
+
+    def _grow(self, min_capacity):
+        capacity = self.capacity
+        while capacity < min_capacity:
+            capacity *= 2
+        for comp_type, column in self.columns.items():
+            new_column = np.zeros((capacity, 2))
+            new_column[:self.capacity] = column
+            self.columns[comp_type] = new_column
+            for slot, view in self.views[comp_type].items():
+                view.row = new_column[slot]
+        prev_positions = np.zeros((capacity, 2))
+        prev_positions[:self.capacity] = self.prev_positions
+        self.prev_positions = prev_positions
+        self.capacity = capacity
@@ -1,7 +1,5 @@
 
-import itertools
 import math
-import random
 
 import numpy as np
 from pygame.locals import *
@@ -9,38 +7,23 @@ from pygame.locals import *
 from .component import *
 from .input_handler import InputIntent
 from .item import *
-from .particle import BubbleParticle
+from .spatial import SpatialHash, aabb_overlap_pairs, aabb_overlaps
 
 
 class System:
     def __init__(self, game):
         self.game = game
+        self.query = game.register_query(self.COMPS)
 
     def run(self):
-        filtered_entities = [entity for entity in self.game.entities
-                             if entity is not None and
-                             all(map(lambda c: entity.has_comp(c),
-                                     self.COMPS))]
-        self._run(filtered_entities)
+        # Snapshot the live query, since systems create and destroy entities
+        # while iterating.
+        self._run(list(self.game.get_query(self.query)))
 
     def _run(self, *_):
         raise NotImplementedError
 
 
-class SnowParticleUpdateSystem(System):
-    COMPS = [PositionComp, VelocityComp, SnowTargetComp]
-
-    def _run(self, entities):
-        # TODO: Perhaps if a player walks over the snow, it disappears or becomes compacted ice.
-        for entity in entities:
-            pos, vel, target = entity.get_comps(PositionComp, VelocityComp, SnowTargetComp)
-            if pos.y == target.y:
-                vel.x = 0
-                vel.y = 0
-            pos.x += vel.x
-            pos.y += vel.y
-
-
 class PlayerUpdateSystem(System):
     COMPS = [PlayerComp, VelocityComp, MoveSpeedComp, InputConfigComp]
     MOVE_SPEED = 5.0
@@ -54,18 +37,22 @@ class PlayerUpdateSystem(System):
             if entity.has_comp(AutoComp):
                 return
             speed = speed.speed
-            if inp_handler.is_key_down(inp_conf.key_map[InputIntent.UP]):
+            held = inp_handler.get_held(inp_conf.slot)
+            if held & InputIntent.UP.bit:
                 vel.y -= speed
-            if inp_handler.is_key_down(inp_conf.key_map[InputIntent.DOWN]):
+            if held & InputIntent.DOWN.bit:
                 vel.y += speed
-            if inp_handler.is_key_down(inp_conf.key_map[InputIntent.LEFT]):
+            if held & InputIntent.LEFT.bit:
                 vel.x -= speed
-            if inp_handler.is_key_down(inp_conf.key_map[InputIntent.RIGHT]):
+            if held & InputIntent.RIGHT.bit:
                 vel.x += speed
 
 
 class AmmoUpdateSystem(System):
     COMPS = [PositionComp, VelocityComp, AmmoComp, InputConfigComp]
+    # Number of ticks between shots fired by bots
+    BOT_FIRE_PERIOD = 15
+    BOT_SHOT_SPEED = 6.0
 
     def _run(self, entities):
         inp_handler = self.game.get_input_handler()
@@ -74,10 +61,32 @@ class AmmoUpdateSystem(System):
             if len(ammo.rounds) == 0:
                 # They're empty.  Remove their ammo belt.
                 entity.remove_comp(AmmoComp)
-            elif inp_handler.is_key_pressed(inp_conf.key_map[InputIntent.FIRE]):
-                projectile_cons = ammo.rounds.popleft()
-                projectile = self.game.create_entity()
-                projectile_cons.init(projectile, entity, pos.x, pos.y, vel.x, vel.y)
+            elif entity.has_comp(BotFlag):
+                if self.game.ticks % AmmoUpdateSystem.BOT_FIRE_PERIOD == 0:
+                    self._fire(entity, pos, *self._aim(entity, pos))
+            elif inp_handler.is_pressed(inp_conf.slot, InputIntent.FIRE):
+                self._fire(entity, pos, vel.x, vel.y)
+
+    def _fire(self, entity, pos, xv, yv):
+        ammo = entity.get_comp(AmmoComp)
+        projectile_cons = ammo.rounds.popleft()
+        projectile = self.game.spawn(projectile_cons, entity, pos.x, pos.y,
+                                     xv, yv)
+        # Pooled projectiles still have the move they were last fired by.
+        projectile.set_comp(MoveComp(ammo.move))
+        self.game.stats.record_fire(entity, projectile)
+
+    def _aim(self, entity, pos):
+        """Returns a shot velocity from `entity` towards its opponent."""
+        if entity is self.game.get_top_player():
+            opponent = self.game.get_bottom_player()
+        else:
+            opponent = self.game.get_top_player()
+        opp_pos = opponent.get_comp(PositionComp)
+        x_diff, y_diff = opp_pos.x - pos.x, opp_pos.y - pos.y
+        dist = math.hypot(x_diff, y_diff) or 1.0
+        return (x_diff / dist * AmmoUpdateSystem.BOT_SHOT_SPEED,
+                y_diff / dist * AmmoUpdateSystem.BOT_SHOT_SPEED)
 
 
 class PositionBoundBounceSystem(System):
@@ -104,36 +113,125 @@ class PositionBoundBounceSystem(System):
 
 class CollideSystem(System):
     COMPS = [PositionComp, VelocityComp, SizeComp, CollideFlag]
+    # Only projectile -> player collisions have an effect, so only those pairs
+    # are ever tested.  Items are collidable too, but have nothing to collide
+    # with until pickups exist.
+    PROJECTILE_COMPS = COMPS + [ProjectileFlag]
+    TARGET_COMPS = COMPS + [PlayerComp]
+    # Above this many projectile/player pairs, a grid broad phase picks the
+    # candidates instead of testing every pair at once.
+    BROAD_PHASE_MIN_PAIRS = 4096
+    DAMAGE = 1
 
-    def _run(self, entities):
-        for (e1, e2) in itertools.combinations(entities, 2):
-            pos1, vel1, size1 = e1.get_comps(PositionComp, VelocityComp, SizeComp)
-            pos2, vel2, size2 = e2.get_comps(PositionComp, VelocityComp, SizeComp)
-            intended_pos1 = PositionComp(pos1.x + vel1.x, pos1.y + vel1.y)
-            intended_pos2 = PositionComp(pos2.x + vel2.x, pos2.y + vel2.y)
-            if (intended_pos1.x < intended_pos2.x + size2.w and
-                intended_pos1.x + size1.w > intended_pos2.x and
-                intended_pos1.y < intended_pos2.y + size2.h and
-                intended_pos1.y + size1.h > intended_pos2.y):
-                if e1.has_comp(ProjectileFlag) and e2.has_comp(PlayerComp):
-                    proj = e1
-                    player = e2
-                elif e2.has_comp(ProjectileFlag) and e1.has_comp(PlayerComp):
-                    proj = e2
-                    player = e1
-                else:
-                    # We're only interested in projectile <-> player collisions.
-                    continue
+    def __init__(self, game):
+        super().__init__(game)
+        self.projectile_query = game.register_query(
+                                        CollideSystem.PROJECTILE_COMPS)
+        self.target_query = game.register_query(CollideSystem.TARGET_COMPS)
+        self.grid = SpatialHash()
+        # Query key -> (slot array, sizes gathered for those slots).
+        self.sizes = {}
 
-                if proj.has_comp(OwnerComp) and proj.get_comp(OwnerComp).owner == player:
+    def run(self):
+        projectiles, proj_boxes = self._gather(self.projectile_query)
+        targets, target_boxes = self._gather(self.target_query)
+        if not projectiles or not targets:
+            return
+
+        if len(projectiles) * len(targets) < CollideSystem.BROAD_PHASE_MIN_PAIRS:
+            proj_idxs, target_idxs = aabb_overlap_pairs(proj_boxes,
+                                                        target_boxes)
+        else:
+            proj_idxs, target_idxs = self._broad_phase(proj_boxes,
+                                                       target_boxes)
+            hits = aabb_overlaps(proj_boxes[proj_idxs],
+                                 target_boxes[target_idxs])
+            proj_idxs, target_idxs = proj_idxs[hits], target_idxs[hits]
+
+        collided_pairs = set()
+        for proj_idx, target_idx in zip(proj_idxs.tolist(),
+                                         target_idxs.tolist()):
+            proj, target = projectiles[proj_idx], targets[target_idx]
+            if proj is target:
+                continue
+            if target.has_comp(ProjectileFlag):
+                # Bots are both projectiles and players, so make sure a pair
+                # of them is only handled once.
+                pair = (min(proj.ident, target.ident),
+                        max(proj.ident, target.ident))
+                if pair in collided_pairs:
                     continue
-                proj.kill()
-                player.get_comp(PlayerComp).curr_health -= 1
+                collided_pairs.add(pair)
+            self._collide(proj, target)
+
+    def _collide(self, proj, player):
+        if proj.has_comp(DeadFlag):
+            # Already spent on another player this tick.
+            return
+        if proj.has_comp(OwnerComp) and proj.get_comp(OwnerComp).owner == player:
+            return
+        proj.kill()
+        player.get_comp(PlayerComp).curr_health -= CollideSystem.DAMAGE
+        self.game.stats.record_damage(proj, player, CollideSystem.DAMAGE)
+
+    def _gather(self, query):
+        """Returns the entities matching `query` and their intended boxes.
+
+        Boxes are the (x, y, w, h) rows each entity will occupy after moving.
+        """
+        entities = list(self.game.get_query(query))
+        store = self.game.store
+        if store is None:
+            boxes = np.array([CollideSystem._intended_box(entity)
+                              for entity in entities], dtype=float)
+            return entities, boxes.reshape(-1, 4)
+        slots = self.game.get_query_slots(query)
+        cached_slots, sizes = self.sizes.get(query, (None, None))
+        if slots is not cached_slots:
+            # Membership changed, so gather the (immutable) sizes again.
+            sizes = np.array([entity.get_comp(SizeComp)
+                              for entity in entities], dtype=float)
+            sizes = sizes.reshape(-1, 2)
+            self.sizes[query] = (slots, sizes)
+        boxes = np.empty((len(slots), 4))
+        boxes[:, :2] = store.column(PositionComp)[slots]
+        boxes[:, :2] += store.column(VelocityComp)[slots]
+        boxes[:, 2:] = sizes
+        return entities, boxes
+
+    def _broad_phase(self, proj_boxes, target_boxes):
+        """Returns the candidate (projectile, target) index pairs.
+
+        Candidates share at least one grid cell.
+        """
+        self.grid.clear()
+        for target_idx, box in enumerate(target_boxes.tolist()):
+            self.grid.insert(target_idx, *box)
+        proj_idxs = []
+        target_idxs = []
+        for proj_idx, box in enumerate(proj_boxes.tolist()):
+            for target_idx in self.grid.query(*box):
+                proj_idxs.append(proj_idx)
+                target_idxs.append(target_idx)
+        return (np.array(proj_idxs, dtype=int),
+                np.array(target_idxs, dtype=int))
+
+    @staticmethod
+    def _intended_box(entity):
+        pos, vel, size = entity.get_comps(PositionComp, VelocityComp, SizeComp)
+        return (pos.x + vel.x, pos.y + vel.y, size.w, size.h)
 
 
 class PositionUpdateSystem(System):
     COMPS = [PositionComp, VelocityComp]
 
+    def run(self):
+        store = self.game.store
+        if store is None:
+            return super().run()
+        slots = self.game.get_query_slots(self.query)
+        store.column(PositionComp)[slots] += store.column(VelocityComp)[slots]
+
     def _run(self, entities):
         for entity in entities:
             pos, vel = entity.get_comps(PositionComp, VelocityComp)
@@ -143,14 +241,21 @@ class PositionUpdateSystem(System):
 
 class VelocityAttenuateSystem(System):
     COMPS = [VelocityComp, VelocityAttenuateFlag]
+    VELOCITY_ATTENUATION = 0.5
 
-    def _run(self, entities):
-        VELOCITY_ATTENUATION = 0.5
+    def run(self):
+        store = self.game.store
+        if store is None:
+            return super().run()
+        slots = self.game.get_query_slots(self.query)
+        store.column(VelocityComp)[slots] *= \
+            VelocityAttenuateSystem.VELOCITY_ATTENUATION
 
+    def _run(self, entities):
         for entity in entities:
             vel = entity.get_comp(VelocityComp)
-            vel.x *= VELOCITY_ATTENUATION
-            vel.y *= VELOCITY_ATTENUATION
+            vel.x *= VelocityAttenuateSystem.VELOCITY_ATTENUATION
+            vel.y *= VelocityAttenuateSystem.VELOCITY_ATTENUATION
 
 
 class LifetimeUpdateSystem(System):
@@ -184,7 +289,10 @@ class DeadCleanupSystem(System):
 
     def _run(self, entities):
         for entity in entities:
-            self.game.destroy_entity(entity)
+            if entity.has_comp(PoolComp):
+                entity.get_comp(PoolComp).pool.release(entity)
+            else:
+                self.game.destroy_entity(entity)
 
 
 class PlayerAnimateUpdateSystem(System):
@@ -201,84 +309,134 @@ class PlayerAnimateUpdateSystem(System):
             if (abs(vel.x) < PlayerAnimateUpdateSystem.IDLE_VELOCITY_THRESHOLD
                 and abs(vel.y) < \
                     PlayerAnimateUpdateSystem.IDLE_VELOCITY_THRESHOLD):
-                anim.delay = PlayerAnimateUpdateSystem.IDLE_ANIM_DELAY
+                delay = PlayerAnimateUpdateSystem.IDLE_ANIM_DELAY
             else:
-                anim.delay = PlayerAnimateUpdateSystem.MOVING_ANIM_DELAY
+                delay = PlayerAnimateUpdateSystem.MOVING_ANIM_DELAY
+            if anim.delay != delay:
+                anim.delay = delay
+                self.game.animate_update_system.join(entity)
 
 
 class AnimateUpdateSystem(System):
+    """Advances one clock per (images, delay) rather than one per sprite.
+
+    Sprites read their frame off their group's clock when drawn, so ticking
+    costs the same however many sprites share each clock.
+    """
     COMPS = [DrawComp, AnimateComp]
 
-    def _run(self, entities):
-        for entity in entities:
-            draw, anim = entity.get_comps(DrawComp, AnimateComp)
-            if anim.clock >= anim.delay:
-                draw.img_idx = (draw.img_idx + 1) % len(draw.images)
-                draw.image = draw.images[draw.img_idx]
-                anim.clock = 0
-            anim.clock += 1
+    def __init__(self, game):
+        super().__init__(game)
+        # (id of images, delay) -> clock shared by the sprites animated so.
+        self.clocks = {}
+        # Slots of the query when sprites were last put on clocks.
+        self.slots = None
+        # Slot -> generation of the entity last put on a clock there, or -1.
+        self.joined = np.full(0, -1)
+
+    def run(self):
+        # The slot array is only rebuilt when the query's membership changes,
+        # which is the only time sprites need joining clocks.
+        slots = self.game.get_query_slots(self.query)
+        if slots is not self.slots:
+            self.slots = slots
+            self._join_new(slots)
+        for clock in self.clocks.values():
+            clock.tick()
+
+    def _join_new(self, slots):
+        """Puts the entities at `slots` that aren't on a clock yet on one."""
+        allocator = self.game.allocator
+        num_generations = len(allocator.generations)
+        if num_generations > len(self.joined):
+            joined = np.full(num_generations, -1)
+            joined[:len(self.joined)] = self.joined
+            self.joined = joined
+        generations = np.asarray(allocator.generations)[slots]
+        new = self.joined[slots] != generations
+        for slot in slots[new].tolist():
+            self.join(allocator.entities[slot])
+        self.joined[slots[new]] = generations[new]
+
+    def join(self, entity):
+        """Puts `entity` on the clock for its images and delay."""
+        draw, anim = entity.get_comps(DrawComp, AnimateComp)
+        key = (id(draw.images), anim.delay)
+        clock = self.clocks.get(key)
+        if clock is None:
+            clock = self.clocks[key] = AnimationClock(draw.images, anim.delay)
+        if draw.clock is not clock:
+            draw.set_clock(clock)
 
 
 class DrawUpdateSystem(System):
     COMPS = [PositionComp, DrawComp]
 
+    def run(self):
+        # Rects are only for drawing, and with the column store `interpolate`
+        # places every sprite right before it's drawn.
+        if self.game.headless or self.game.store is not None:
+            return
+        super().run()
+
     def _run(self, entities):
         for entity in entities:
             pos, draw = entity.get_comps(PositionComp, DrawComp)
             draw.rect.topleft = (pos.x, pos.y)
 
+    def interpolate(self, alpha):
+        """Draws sprites `alpha` of the way through the last tick's movement.
+
+        Needs the column store, which remembers where things were; without
+        it, sprites stay where the last tick put them.
+        """
+        store = self.game.store
+        if store is None:
+            return
+        entities = self.game.get_query(self.query)
+        slots = self.game.get_query_slots(self.query)
+        positions = store.interpolate_positions(slots, alpha).tolist()
+        for entity, topleft in zip(entities, positions):
+            entity.get_comp(DrawComp).rect.topleft = topleft
+
 
 class ScheduleSystem(System):
     COMPS = [JobScheduleComp]
     def __init__(self, game):
         super().__init__(game)
-        self.funcs = {'spawn_orn': lambda: OrnamentItem.init(
-                                           self.game.create_entity(),
-                                           self.get_rand_pos()),
-                      'spawn_beer': lambda: BeerItem.init(
-                                           self.game.create_entity(),
-                                           self.get_rand_pos())
+        self.funcs = {'spawn_orn': lambda: self.game.spawn(
+                                           OrnamentItem, self.get_rand_pos()),
+                      'spawn_beer': lambda: self.game.spawn(
+                                           BeerItem, self.get_rand_pos())
                      }
     def get_rand_pos(self):
-        return np.random.randint(self.game.width), \
-               np.random.randint(self.game.height)
+        return self.game.rng.integers(self.game.width), \
+               self.game.rng.integers(self.game.height)
     def _run(self, entities):
-        t = pg.time.get_ticks()
+        t = self.game.get_time()
         for entity in entities:
             job_sch = entity.get_comp(JobScheduleComp)
             if t >= job_sch.tick_time:
                 self.funcs[job_sch.f]()
-                job_sch.reset(t)
+                job_sch.reset(self.game.rng, t)
 
 
 class ParticleSystem(System):
-    COMPS = [ParticleSourceComp, PositionComp, VelocityComp]
-    DEFAULT_SPEED = 1
+    COMPS = [ParticleSourceComp, PositionComp]
 
     def _run(self, entities):
+        # Group the sources by effect, so that each effect's particles are
+        # emitted all at once.
+        sources = {}
         for e in entities:
-            src, pos, vel = e.get_comps(ParticleSourceComp,
-                                        PositionComp,
-                                        VelocityComp)
-            self._gen_particle_cloud(src, pos, vel)
-
-    def _gen_particle_cloud(self, src, pos, vel):
-        if src.type != 'drunk':
-            raise NotImplementedError('Only drunkenness is supported now.')
-
-        if np.random.rand() > 0.1:
-            return
-
-        # TODO: Generate particle cloud.
-        num = np.random.randint(src.intensity)
-        if num == 0:
-            return
-
-        mean = [pos.x, pos.y]
-        variance = 50
-        cov = [[variance, 0], [0, variance]]
-        for p_pos in np.random.multivariate_normal(mean, cov, num):
-            BubbleParticle.init(self.game.create_entity(), p_pos)
+            src, pos = e.get_comps(ParticleSourceComp, PositionComp)
+            sources.setdefault(src.type, []).append((pos.x, pos.y,
+                                                     src.intensity))
+        particles = self.game.particles
+        for effect, rows in sources.items():
+            rows = np.array(rows, dtype=float)
+            particles.emit(effect, rows[:, :2], rows[:, 2])
+        particles.update()
 
 # TODO: Unfnished business below.
 # class OrnamentUpdateSystem(System):
@@ -304,13 +462,22 @@ class AutonomousUpdateSystem(System):
                                            VelocityComp)
             if not e.has_comp(AutoComp):
                 continue # We don't like normies.
-            has_opp = AutonomousUpdateSystem.assign_opponent(e, entities)
+            if e.has_comp(OwnerComp):
+                has_opp = AutonomousUpdateSystem.assign_opponent(
+                                                    e, entities, self.game.rng)
+            elif e.has_comp(BotFlag):
+                # Bot-controlled players go after each other.
+                has_opp = self.assign_rival(e)
+            else:
+                continue
             if not has_opp:
                 continue
-            AutonomousUpdateSystem.move_player(e, entities)
+            AutonomousUpdateSystem.move_player(e, entities,
+                                               self.game.get_time(),
+                                               self.game.rng)
 
     @staticmethod
-    def move_player(entity, entities):
+    def move_player(entity, entities, t, rng):
         pos, vel = entity.get_comps(PositionComp, VelocityComp)
         opp_entity = AutonomousUpdateSystem.get_opponent(entity, entities)
         opp_comps = opp_entity.get_comps(PlayerComp,   \
@@ -323,7 +490,8 @@ class AutonomousUpdateSystem(System):
         # Package up input from game and let model choose next state.
         _, opp_pos, opp_vel = opp_comps
         eingan = {
-            't': pg.time.get_ticks(),
+            't': t,
+            'rng': rng,
             'pos': pos,
             'vel': vel,
             'opp_pos': opp_pos,
@@ -347,13 +515,24 @@ class AutonomousUpdateSystem(System):
                 return e
         return None
 
+    def assign_rival(self, entity):
+        """Makes the other player the opponent of player `entity`."""
+        top_player = self.game.get_top_player()
+        if entity is top_player:
+            rival = self.game.get_bottom_player()
+        else:
+            rival = top_player
+        entity.get_comp(PlayerComp).opponent_name = \
+            rival.get_comp(PlayerComp).name
+        return True
+
     @staticmethod
-    def assign_opponent(entity, entities):
+    def assign_opponent(entity, entities, rng):
         if not entity.has_comp(OwnerComp):
             return False
         player = entity.get_comp(PlayerComp)
         owner = entity.get_comp(OwnerComp).owner.get_comp(PlayerComp)
         victims = list(filter(lambda e: e.get_comp(PlayerComp).name not in \
                                         [player.name, owner.name], entities))
-        player.opponent_name = random.choice(victims).get_comp(PlayerComp).name
+        player.opponent_name = rng.choice(victims).get_comp(PlayerComp).name
         return True
\ No newline at end of file
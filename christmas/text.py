@@ -0,0 +1,37 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces, keyed by (font, text, color)."""
+    DEFAULT_MAX_SIZE = 256
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self._surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        """Returns `text` rendered (antialiased) in `font` and `color`.
+
+        The returned surface is shared, so it must not be drawn on.
+        """
+        key = (font, text, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, 1, color)
+            self._surfaces[key] = surface
+            if len(self._surfaces) > self.max_size:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+
+
+TEXT_CACHE = TextCache()
+
+
+def render_text(font, text, color):
+    """Renders `text` through the shared `TextCache`."""
+    return TEXT_CACHE.render(font, text, color)
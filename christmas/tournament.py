@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""Runs seeded bot-vs-bot matches in parallel, for balance testing.
+
+Every Weber fights Santa once per (move, seed), with the Weber's bot always
+picking that move.  Run from the repository root with
+`python -m christmas.tournament`.
+"""
+
+import argparse
+from collections import namedtuple
+import csv
+import multiprocessing
+import sys
+
+from .component import PlayerComp
+from .game import Game
+from .santa import Santa
+
+
+WIDTH, HEIGHT = 700, 700
+NUM_MOVES = 3
+# Keeps stalemates from running forever.
+DEFAULT_MAX_TICKS = 10000
+
+MatchConfig = namedtuple('MatchConfig', ['weber', 'move', 'seed', 'max_ticks'])
+
+MatchResult = namedtuple('MatchResult', ['weber', 'move', 'seed', 'winner',
+                                         'ticks', 'damage_by_move',
+                                         'projectiles_fired'])
+
+
+def run_match(config):
+    """Plays the match described by `config` headlessly."""
+    game = Game(WIDTH, HEIGHT, headless=True, max_ticks=config.max_ticks,
+                weber=config.weber, top_move=config.move, seed=config.seed)
+    game.start()
+    winner = game.get_winner()
+    return MatchResult(config.weber, config.move, config.seed,
+                       winner.get_comp(PlayerComp).name if winner else None,
+                       game.ticks, dict(game.stats.damage_by_move),
+                       dict(game.stats.projectiles_fired))
+
+
+def run_tournament(configs, processes=None):
+    """Plays every match in `configs`, one per worker process.
+
+    `processes` defaults to the number of CPUs.  Returns the results in the
+    order of `configs`.
+    """
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(run_match, configs, chunksize=1)
+
+
+def make_configs(webers, seeds, max_ticks=DEFAULT_MAX_TICKS):
+    return [MatchConfig(weber, move, seed, max_ticks)
+            for weber in webers
+            for move in range(NUM_MOVES)
+            for seed in seeds]
+
+
+def damage_dealt(result, name):
+    """Returns the total damage dealt by the player called `name`."""
+    return sum(damage for (player, _), damage in result.damage_by_move.items()
+               if player == name)
+
+
+def summarize(results):
+    """Aggregates `results` into one row per (Weber, move)."""
+    rows = {}
+    for result in results:
+        row = rows.setdefault((result.weber, result.move), {
+            'weber': result.weber,
+            'move': result.move,
+            'matches': 0,
+            'wins': 0,
+            'draws': 0,
+            'ticks': 0,
+            'damage': 0,
+            'taken': 0,
+            'fired': 0,
+        })
+        row['matches'] += 1
+        row['wins'] += result.winner == result.weber
+        row['draws'] += result.winner is None
+        row['ticks'] += result.ticks
+        row['damage'] += damage_dealt(result, result.weber)
+        row['taken'] += damage_dealt(result, Santa.NAME)
+        row['fired'] += result.projectiles_fired.get(result.weber, 0)
+    return list(rows.values())
+
+
+def print_table(rows, file=sys.stdout):
+    print(f'{"weber":<12} {"move":>4} {"n":>5} {"win%":>6} {"draw%":>6} '
+          f'{"ticks":>8} {"dmg":>6} {"taken":>6} {"fired":>6}', file=file)
+    for row in rows:
+        n = row['matches']
+        print(f'{row["weber"]:<12} {row["move"]:>4} {n:>5} '
+              f'{100 * row["wins"] / n:>6.1f} {100 * row["draws"] / n:>6.1f} '
+              f'{row["ticks"] / n:>8.1f} {row["damage"] / n:>6.2f} '
+              f'{row["taken"] / n:>6.2f} {row["fired"] / n:>6.2f}',
+              file=file)
+
+
+def write_csv(results, path):
+    """Writes one row per match to `path`."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['weber', 'move', 'seed', 'winner', 'ticks',
+                         'weber_damage', 'santa_damage', 'weber_fired',
+                         'santa_fired'])
+        for result in results:
+            writer.writerow([result.weber, result.move, result.seed,
+                             result.winner or '', result.ticks,
+                             damage_dealt(result, result.weber),
+                             damage_dealt(result, Santa.NAME),
+                             result.projectiles_fired.get(result.weber, 0),
+                             result.projectiles_fired.get(Santa.NAME, 0)])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('-n', '--seeds', type=int, default=10,
+                    help='Matches per (Weber, move).')
+    ap.add_argument('-w', '--weber', action='append',
+                    help='Only plays this Weber (repeatable).')
+    ap.add_argument('-p', '--processes', type=int, default=None,
+                    help='Worker processes (defaults to the number of CPUs).')
+    ap.add_argument('-t', '--ticks', type=int, default=DEFAULT_MAX_TICKS,
+                    help='Ends undecided matches after this many ticks.')
+    ap.add_argument('--csv', help='Also writes per-match results here.')
+    args = ap.parse_args()
+
+    webers = args.weber or [weber.NAME for weber in Game.WEBERS]
+    configs = make_configs(webers, range(args.seeds), args.ticks)
+    results = run_tournament(configs, args.processes)
+    print_table(summarize(results))
+    if args.csv:
+        write_csv(results, args.csv)
+
+
+if __name__ == '__main__':
+    main()
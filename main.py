@@ -3,7 +3,9 @@
 import argparse
 import sys
 
+from christmas.component import PlayerComp
 from christmas.game import Game
+from christmas.replay import Replay
 
 
 WIDTH, HEIGHT = 700, 700
@@ -13,9 +15,39 @@ def main():
     # Parse optional debug flag.
     ap = argparse.ArgumentParser()
     ap.add_argument('-d', '--debug', action='store_true', help='Sets debugging flag.')
+    ap.add_argument('--headless', action='store_true',
+                    help='Simulates a bot match as fast as possible, without a window.')
+    ap.add_argument('-t', '--ticks', type=int, default=None,
+                    help='Ends the game after this many ticks.')
+    ap.add_argument('-s', '--seed', type=int, default=None,
+                    help='Seeds the game, to play the same match again.')
+    ap.add_argument('--profile', default=None, metavar='PATH',
+                    help='Times each stage of every frame, and writes them '
+                         'to PATH (.csv or .json) on exit.')
+    ap.add_argument('--fps', type=int, default=Game.RENDER_FPS,
+                    help='Caps the frames rendered per second (0 for no cap). '
+                         'The game itself always runs at the same speed.')
+    ap.add_argument('--record', default=None, metavar='PATH',
+                    help='Saves a replay of the game to PATH.')
+    ap.add_argument('--replay', default=None, metavar='PATH',
+                    help='Plays back the replay at PATH (as fast as possible '
+                         'with --headless).')
     args = vars(ap.parse_args())
 
-    Game(WIDTH, HEIGHT, debug_mode=args['debug']).start()
+    options = dict(debug_mode=args['debug'], headless=args['headless'],
+                   profile=args['profile'], render_fps=args['fps'],
+                   record=args['record'])
+    if args['replay']:
+        game = Game.from_replay(Replay.load(args['replay']), **options)
+    else:
+        game = Game(WIDTH, HEIGHT, max_ticks=args['ticks'], seed=args['seed'],
+                    **options)
+    game.start()
+    if args['headless']:
+        winner = game.get_winner()
+        winner_name = winner.get_comp(PlayerComp).name if winner else 'nobody'
+        print(f'{winner_name} won after {game.ticks} ticks '
+              f'(seed {game.rng.seed}).')
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -2,13 +2,16 @@ import matplotlib.pyplot as plt
 import unittest
 
 from christmas.globe import Perlin
+from christmas.rng import Rng
 
 
 class PerlinTest(unittest.TestCase):
     """Visual, qualitative test of snowscape generation."""
     def test(self):
-        grid = Perlin.generate(20, 20, 50)
-        plt.imshow(grid, origin='upper')
+        seed = int(Rng().integers(Perlin.SEED_MAX + 1))
+        grid = Perlin.mask(700, 700, seed)
+        # The grid is indexed [x, y].
+        plt.imshow(grid.T, origin='upper')
         plt.show()
 
 if __name__ == '__main__':
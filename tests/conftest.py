@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Never open a real window or audio device.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    # Resources are loaded relative to the repository root.
+    monkeypatch.chdir(ROOT)
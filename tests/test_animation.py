@@ -0,0 +1,52 @@
+import pygame as pg
+
+from christmas.component import AnimateComp, DrawComp
+from christmas.game import Game
+
+
+# Two distinct frames, shared by every test sprite.
+FRAMES = [pg.Surface((4, 4)), pg.Surface((4, 4))]
+
+
+def make_game():
+    game = Game(700, 700, headless=True, seed=0)
+    game.init()
+    return game
+
+
+def add_sprite(game):
+    entity = game.create_entity()
+    entity.add_comp(DrawComp(FRAMES))
+    entity.add_comp(AnimateComp(1))
+    return entity
+
+
+def test_sprites_start_at_their_first_frame():
+    game = make_game()
+    first = add_sprite(game)
+    game.step()
+    while first.get_comp(DrawComp).img_idx == 0:
+        game.step()
+    second = add_sprite(game)
+    system = game.animate_update_system
+    system._join_new(game.get_query_slots(system.query))
+    first_draw, second_draw = (first.get_comp(DrawComp),
+                               second.get_comp(DrawComp))
+    assert second_draw.clock is first_draw.clock
+    assert second_draw.img_idx == 0
+    assert first_draw.img_idx == 1
+
+
+def test_only_new_sprites_join_clocks(monkeypatch):
+    game = make_game()
+    for _ in range(100):
+        add_sprite(game)
+    game.step()
+    joined = []
+    system = game.animate_update_system
+    monkeypatch.setattr(system, 'join', joined.append)
+    sprites = []
+    for _ in range(10):
+        sprites.append(add_sprite(game))
+        game.step()
+    assert joined == sprites
@@ -0,0 +1,8 @@
+from christmas.game import Game
+from christmas.globe import SnowGlobe
+
+
+def test_headless_games_skip_the_terrain():
+    SnowGlobe.terrain.cache_clear()
+    Game(700, 700, headless=True, seed=0).init()
+    assert SnowGlobe.terrain.cache_info().currsize == 0
@@ -0,0 +1,39 @@
+from christmas.component import DeadFlag, PositionComp
+from christmas.dialog import MugTextFrame
+from christmas.game import Game
+from christmas.projectile import CoalProjectile
+
+
+def make_game():
+    game = Game(700, 700, headless=True, seed=0)
+    game.init()
+    game.step()
+    return game
+
+
+def interpolated(game, entity, alpha):
+    return tuple(game.store.interpolate_positions([entity.ident], alpha)[0])
+
+
+def position(entity):
+    pos = entity.get_comp(PositionComp)
+    return (pos.x, pos.y)
+
+
+def test_mug_is_drawn_where_its_put():
+    game = make_game()
+    frame = MugTextFrame(game, game.top_player, 'Hi')
+    frame.update(game.dialog_window.get_rect())
+    assert interpolated(game, frame.mug, 0.5) == position(frame.mug)
+
+
+def test_revived_projectile_is_drawn_where_its_fired():
+    game = make_game()
+    projectile = game.spawn(CoalProjectile, game.top_player, 300, 300, 0, 0)
+    # Killed, so the next tick releases it to the pool.
+    projectile.add_comp(DeadFlag())
+    game.step()
+    revived = game.spawn(CoalProjectile, game.top_player, 10, 10, 0, 0)
+    assert revived is projectile
+    assert position(revived) == (10, 10)
+    assert interpolated(game, revived, 0.5) == (10, 10)
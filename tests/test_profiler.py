@@ -0,0 +1,16 @@
+import csv
+
+from christmas.profiler import Profiler
+
+
+def test_csv_dump_has_unique_columns(tmp_path):
+    profiler = Profiler(trace=True)
+    for _ in range(3):
+        profiler.record('render', 1.0)
+        profiler.end_frame()
+    path = str(tmp_path / 'profile.csv')
+    profiler.dump(path)
+    with open(path, newline='') as f:
+        header = next(csv.reader(f))
+    assert len(header) == len(set(header))
+    assert Profiler.FRAME in header
@@ -0,0 +1,20 @@
+import pytest
+
+from christmas.replay import Replay
+
+
+def test_load_rejects_other_versions(tmp_path, monkeypatch):
+    path = str(tmp_path / 'old.replay')
+    with monkeypatch.context() as m:
+        m.setattr(Replay, 'VERSION', 1)
+        Replay(0, 'Benjamin', bytes(4)).save(path)
+    with pytest.raises(ValueError, match='version 1'):
+        Replay.load(path)
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / 'match.replay')
+    Replay(1234, 'Benjamin', bytes(range(6)), top_move=2).save(path)
+    replay = Replay.load(path)
+    assert (replay.seed, replay.weber, replay.intents, replay.top_move) == \
+           (1234, 'Benjamin', bytes(range(6)), 2)
@@ -0,0 +1,25 @@
+import pygame as pg
+
+from christmas.rng import Rng
+from christmas.sound import Sound, SoundType
+
+
+def test_update_keeps_paused_music_paused(monkeypatch):
+    sound = Sound(Rng(0))
+    try:
+        # As if fight music were playing.  The mixer reports paused music as
+        # not busy.
+        sound._music_type = SoundType.MUSIC_FIGHT
+        played = []
+        monkeypatch.setattr(sound, 'play', played.append)
+        monkeypatch.setattr(pg.mixer.music, 'get_busy', lambda: False)
+        sound.pause()
+        sound.update()
+        assert played == []
+        # Once unpaused, music that isn't busy has finished, so restart it.
+        sound.unpause()
+        sound.update()
+        assert played == [SoundType.MUSIC_FIGHT]
+    finally:
+        sound.stop()
+        pg.mixer.quit()
@@ -0,0 +1,8 @@
+from christmas.tournament import DEFAULT_MAX_TICKS, MatchConfig, run_match
+
+
+def test_moves_change_the_outcome():
+    results = [run_match(MatchConfig('Benjamin', move, 0, DEFAULT_MAX_TICKS))
+               for move in (0, 1)]
+    outcomes = [(result.winner, result.ticks) for result in results]
+    assert outcomes[0] != outcomes[1]